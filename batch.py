@@ -0,0 +1,80 @@
+"""Solve a stack of many small independent linear systems at once.
+
+The systems are given as one K x m x (n+1) array of augmented matrices.
+Gauss-Jordan elimination with partial pivoting runs on all K of them
+together, looping only over the n columns, so no Python work is done per
+system.
+"""
+import numpy as np
+
+TOLERANCE = 1e-10
+
+# Per-system status codes.
+UNIQUE = 0
+NO_SOLUTIONS = 1
+INFINITE_SOLUTIONS = 2
+
+
+def stack_systems(systems):
+    """K x m x (n+1) array from LinearSystems with the same shape."""
+    return np.stack([system.to_matrix() for system in systems])
+
+
+def solve_batch(systems, tolerance=TOLERANCE):
+    """
+    Solve every system in a K x m x (n+1) stack of augmented matrices.
+
+    Returns (status, solutions, rank): status holds UNIQUE, NO_SOLUTIONS or
+    INFINITE_SOLUTIONS per system, solutions is K x n with the unique
+    solution, or the basepoint with free variables set to 0 when there are
+    infinitely many, and NaN rows where there are none.
+    """
+    matrices = np.array(systems, dtype=np.float64)
+    if matrices.ndim != 3:
+        raise ValueError('Expected a K x m x (n+1) array of augmented matrices')
+    num_systems, num_equations, num_columns = matrices.shape
+    num_variables = num_columns - 1
+
+    everything = np.arange(num_systems)
+    rows = np.arange(num_equations)
+    current = np.zeros(num_systems, dtype=np.intp)
+    pivot_columns = np.full((num_systems, num_equations), -1)
+
+    for col in range(num_variables):
+        eligible = rows[np.newaxis, :] >= current[:, np.newaxis]
+        magnitudes = np.where(eligible, np.abs(matrices[:, :, col]), -1)
+        pivot_rows = np.argmax(magnitudes, axis=1)
+        has_pivot = magnitudes[everything, pivot_rows] > tolerance
+        if not has_pivot.any():
+            continue
+
+        which = everything[has_pivot]
+        pivot_rows = pivot_rows[has_pivot]
+        target_rows = current[has_pivot]
+
+        swapped = matrices[which, pivot_rows]
+        matrices[which, pivot_rows] = matrices[which, target_rows]
+        pivot = swapped / swapped[:, col, np.newaxis]
+        matrices[which, target_rows] = pivot
+
+        factors = matrices[which, :, col]
+        factors[np.arange(len(which)), target_rows] = 0
+        matrices[which] -= factors[:, :, np.newaxis] * pivot[:, np.newaxis, :]
+
+        pivot_columns[which, target_rows] = col
+        current[has_pivot] += 1
+
+    rank = current
+    beyond_rank = rows[np.newaxis, :] >= rank[:, np.newaxis]
+    contradictory = np.any(beyond_rank & (np.abs(matrices[:, :, -1]) > tolerance), axis=1)
+
+    status = np.where(rank == num_variables, UNIQUE, INFINITE_SOLUTIONS)
+    status[contradictory] = NO_SOLUTIONS
+
+    solutions = np.zeros((num_systems, num_variables))
+    system_index, row_index = np.nonzero(pivot_columns >= 0)
+    solutions[system_index, pivot_columns[system_index, row_index]] = \
+        matrices[system_index, row_index, -1]
+    solutions[contradictory] = np.nan
+
+    return status, solutions, rank
@@ -0,0 +1,287 @@
+"""Benchmarks for vectors, lines and linear systems.
+
+Times Vector arithmetic, angle and projectOn, Line.intersectionWith and
+LinearSystem.compute_triangular_form, compute_rref and compute_solution
+over a grid of sizes, densities, backends and engines. Inputs come from
+a seeded generator, so every run times the same problems. Results are
+written as JSON and can be compared against an earlier run:
+
+    python bench.py --output baseline.json
+    python bench.py --compare baseline.json
+
+The comparison exits with status 1 when a case got slower than the
+baseline by more than the threshold. The full grid takes tens of
+minutes; --quick stops at 100 variables (about ten minutes).
+
+BASELINE is a reference --quick run committed with the code, and
+--compare without a file compares against it. Its "meta" records the
+machine it was timed on. Timings only compare on the same machine, so
+before relying on the comparison regenerate it there from a known good
+revision:
+
+    python bench.py --quick --output bench_baseline.json
+    python bench.py --quick --compare
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from statistics import median
+
+import numpy as np
+
+from line import Line
+from linsys import LinearSystem
+from plane import Plane
+from hyperplane import Hyperplane
+from vector import Vector, BACKENDS
+
+SIZES = (3, 10, 100, 1000)
+QUICK_SIZES = (3, 10, 100)
+DENSITIES = (1.0, 0.1)
+ENGINES = (LinearSystem.PLANES_ENGINE, LinearSystem.DENSE_ENGINE,
+           LinearSystem.BLOCKED_ENGINE, LinearSystem.EXACT_ENGINE,
+           LinearSystem.MODULAR_ENGINE, LinearSystem.LU_ENGINE)
+# Largest number of variables each engine is timed at: the planes
+# engine does O(n^3) scalar operations on Vector objects, and the exact
+# ones have entries that grow with n.
+MAX_SIZES = {
+    LinearSystem.PLANES_ENGINE: 100,
+    LinearSystem.EXACT_ENGINE: 100,
+    LinearSystem.MODULAR_ENGINE: 100,
+}
+SYSTEM_OPERATIONS = ('compute_triangular_form', 'compute_rref', 'compute_solution')
+# Only one engine computes an LU factorization rather than a form.
+SOLUTION_ONLY_ENGINES = (LinearSystem.LU_ENGINE,)
+
+REPEATS = 5
+# Each timed sample loops over about this many coordinates.
+COORDINATES_PER_SAMPLE = 20000
+LINE_PAIRS = 1000
+THRESHOLD = 0.25
+SEED = 0
+# Not stdout: importing linsys prints its demo system.
+OUTPUT = 'bench_results.json'
+BASELINE = 'bench_baseline.json'
+
+
+def random_coordinates(rng, size, density):
+    """size small integers, each nonzero with probability density (never all zero)."""
+    coordinates = [rng.randint(1, 9) * rng.choice((-1, 1)) if rng.random() < density else 0
+                   for _ in range(size)]
+    if not any(coordinates):
+        coordinates[rng.randrange(size)] = 1
+    return coordinates
+
+
+def random_system(rng, size, density, backend):
+    """
+    A size x size system with a unique solution: the diagonal dominates
+    its row, so no engine needs to swap rows to find a pivot.
+    """
+    if size == 2:
+        kind = Line
+    elif size == 3:
+        kind = Plane
+    else:
+        kind = Hyperplane
+    planes = []
+    for row in range(size):
+        coordinates = random_coordinates(rng, size, density)
+        coordinates[row] = 10 * size
+        planes.append(kind(normal_vector=Vector(coordinates, backend),
+                           constant_term=rng.randint(-99, 99)))
+    return LinearSystem(planes)
+
+
+def vector_pairs(rng, size, density, backend, count):
+    return [(Vector(random_coordinates(rng, size, density), backend),
+             Vector(random_coordinates(rng, size, density), backend))
+            for _ in range(count)]
+
+
+def vector_case(operation):
+    """A case timing operation(v, w) on fresh pairs, so no cached value is reused."""
+    def make(rng, size, density, backend):
+        pairs = vector_pairs(rng, size, density, backend,
+                             max(1, COORDINATES_PER_SAMPLE // size))
+
+        def run():
+            for v, w in pairs:
+                operation(v, w)
+        return run, len(pairs)
+    return make
+
+
+VECTOR_CASES = {
+    'vector.add': vector_case(lambda v, w: v + w),
+    'vector.sub': vector_case(lambda v, w: v - w),
+    'vector.scale': vector_case(lambda v, w: v * 3),
+    'vector.dot': vector_case(lambda v, w: v * w),
+    'vector.angle': vector_case(lambda v, w: v.angle(w)),
+    'vector.projectOn': vector_case(lambda v, w: v.projectOn(w)),
+}
+
+
+def make_line_intersection(rng, size, density, backend):
+    pairs = [(Line(Vector(random_coordinates(rng, 2, 1.0), backend), rng.randint(-99, 99)),
+              Line(Vector(random_coordinates(rng, 2, 1.0), backend), rng.randint(-99, 99)))
+             for _ in range(LINE_PAIRS)]
+
+    def run():
+        for l1, l2 in pairs:
+            l1.intersectionWith(l2)
+    return run, len(pairs)
+
+
+def system_case(operation, engine):
+    def make(rng, size, density, backend):
+        system = random_system(rng, size, density, backend)
+
+        def run():
+            getattr(system, operation)(engine=engine)
+        return run, 1
+    return make
+
+
+def measure(make, rng, size, density, backend, repeats):
+    """Seconds per call of the fastest and the median sample."""
+    samples = []
+    for _ in range(repeats):
+        run, calls = make(rng, size, density, backend)
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / calls)
+        # One sample is plenty for anything this slow.
+        if samples[-1] * calls > 10:
+            break
+    return min(samples), median(samples), len(samples)
+
+
+def cases(sizes, densities, backends, engines):
+    """Yield (name, engine, size, density, backend, make) for every case in the grid."""
+    for backend in backends:
+        yield 'line.intersectionWith', None, 2, 1.0, backend, make_line_intersection
+        for size in sizes:
+            for density in densities:
+                for name, make in VECTOR_CASES.items():
+                    yield name, None, size, density, backend, make
+                for engine in engines:
+                    if size > MAX_SIZES.get(engine, size):
+                        continue
+                    for operation in SYSTEM_OPERATIONS:
+                        if (engine in SOLUTION_ONLY_ENGINES and
+                                operation != 'compute_solution'):
+                            continue
+                        yield ('linsys.' + operation, engine, size, density, backend,
+                               system_case(operation, engine))
+
+
+def run_benchmarks(sizes=SIZES, densities=DENSITIES, backends=BACKENDS, engines=ENGINES,
+                   repeats=REPEATS, seed=SEED, log=None):
+    """Run every case and return the results as a JSON-ready dict."""
+    results = []
+    for name, engine, size, density, backend, make in cases(sizes, densities, backends, engines):
+        # A generator per case: its inputs do not depend on which cases ran before.
+        rng = random.Random('{} {} {} {} {}'.format(seed, name, engine, size, density))
+        best, middle, samples = measure(make, rng, size, density, backend, repeats)
+        result = {'name': name, 'engine': engine, 'size': size, 'density': density,
+                  'backend': backend, 'seconds': best, 'median': middle,
+                  'samples': samples}
+        results.append(result)
+        if log is not None:
+            log.write('{:<32} {:>8} {:>5} {:>5} {:>9} {:.3e}s\n'.format(
+                name, engine or '-', size, density, backend, best))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeats': repeats,
+        },
+        'results': results,
+    }
+
+
+def case_key(result):
+    return (result['name'], result['engine'], result['size'], result['density'],
+            result['backend'])
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Match results to baseline by case and return (regressions,
+    improvements), lists of (result, baseline seconds, ratio). A case
+    regresses when it takes more than 1 + threshold times as long.
+    """
+    previous = {case_key(r): r['seconds'] for r in baseline['results']}
+    regressions, improvements = [], []
+    for result in results['results']:
+        before = previous.get(case_key(result))
+        if not before:
+            continue
+        ratio = result['seconds'] / before
+        if ratio > 1 + threshold:
+            regressions.append((result, before, ratio))
+        elif ratio < 1 / (1 + threshold):
+            improvements.append((result, before, ratio))
+    return regressions, improvements
+
+
+def report(title, changes, out):
+    if not changes:
+        return
+    out.write('{}:\n'.format(title))
+    for result, before, ratio in changes:
+        out.write('  {:<32} {:>8} {:>5} {:>5} {:>9} {:.3e}s -> {:.3e}s ({:.2f}x)\n'.format(
+            result['name'], result['engine'] or '-', result['size'], result['density'],
+            result['backend'], before, result['seconds'], ratio))
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--quick', action='store_true',
+                        help='sizes {} only'.format(' '.join(map(str, QUICK_SIZES))))
+    parser.add_argument('--densities', type=float, nargs='+', default=DENSITIES)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', default=OUTPUT,
+                        help='file to write the results to as JSON (default %(default)s)')
+    parser.add_argument('--compare', metavar='BASELINE', nargs='?', const=BASELINE,
+                        help='JSON results of an earlier run to compare against '
+                             '(default %(const)s)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='slowdown allowed before a case counts as a regression')
+    parser.add_argument('--quiet', action='store_true', help='do not log each case')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    sizes = QUICK_SIZES if arguments.quick else arguments.sizes
+    results = run_benchmarks(sizes, arguments.densities, arguments.backends,
+                             arguments.engines, arguments.repeats, arguments.seed,
+                             None if arguments.quiet else sys.stderr)
+    with open(arguments.output, 'w') as f:
+        json.dump(results, f, indent=1)
+
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            baseline = json.load(f)
+        regressions, improvements = compare(results, baseline, arguments.threshold)
+        report('Slower than the baseline', regressions, sys.stderr)
+        report('Faster than the baseline', improvements, sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""A bounded LRU cache of LinearSystem solutions.
+
+Systems are keyed on a SHA-256 digest of their coefficients and constant
+terms together with the backend, engine and pivoting used, so the same
+equations arriving as different objects share one entry. The digest does
+not depend on how a system is stored: values that are exactly float64 are
+hashed as the float64 augmented matrix, whatever their backend, and only
+exact (decimal, fraction) values that are not are hashed as fractions. An
+array-backed system counts as the default backend, the one its planes
+have once it is solved by the planes engine.
+
+With canonical=True, systems that only differ in the order of their
+equations or by a nonzero factor on an equation share a key too: every
+row is divided by its leading coefficient and the rows are sorted before
+hashing. The division is done on the exact values as fractions, for float
+backends too, so two systems only share a canonical key when their
+equations are exactly proportional; this costs a pass of fraction
+arithmetic over the system on every lookup.
+
+Cached solutions are shared between callers and must not be modified.
+A cached solve never reduces the caller's planes in place, so copy=False
+is rejected: a hit would leave the system as it was and a miss would not.
+"""
+import hashlib
+import sys
+from collections import OrderedDict
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import vector
+from vector import DECIMAL, FRACTION, index_of_first_nonzero
+
+MAX_ENTRIES = 128
+
+CACHE_NEEDS_COPY_MSG = 'A cached solve cannot reduce the system in place (copy=False)'
+
+
+def exact_rows(system):
+    """The augmented rows of system as tuples of Fractions."""
+    return [tuple(Fraction(a) for a in row) for row in system.to_rows()]
+
+
+def is_float64(value):
+    """Whether the Fraction value is exactly a (finite) float64."""
+    try:
+        return Fraction(float(value)) == value
+    except OverflowError:
+        return False
+
+
+def canonical_exact_rows(rows):
+    """Divide each row by its leading entry (the constant for 0 = k) and sort the rows."""
+    canonical = []
+    for row in rows:
+        lead = index_of_first_nonzero(row)
+        if lead >= 0:
+            row = tuple(a / row[lead] for a in row)
+        canonical.append(row)
+    return sorted(canonical)
+
+
+def system_digest(system, canonical=False):
+    """Hex SHA-256 of the coefficients and constant terms of system."""
+    digest = hashlib.sha256()
+    digest.update('{} {}\n'.format(len(system), system.dimension).encode())
+    matrix = rows = None
+    if canonical:
+        rows = canonical_exact_rows(exact_rows(system))
+    elif not system.is_array_backed() and system.backend() in (DECIMAL, FRACTION):
+        rows = exact_rows(system)
+        if np is not None and all(is_float64(a) for row in rows for a in row):
+            matrix, rows = np.array(rows, dtype=np.float64), None
+    elif np is not None:
+        matrix = system.to_matrix()
+    else:
+        rows = exact_rows(system)
+    if rows is not None:
+        for row in rows:
+            digest.update(' '.join('{}/{}'.format(a.numerator, a.denominator)
+                                   for a in row).encode())
+            digest.update(b'\n')
+    else:
+        # Adding 0.0 turns -0.0 into 0.0, which has different bytes.
+        digest.update(np.ascontiguousarray(matrix + 0.0, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def estimated_size(value):
+    """Rough number of bytes held by a cached solution."""
+    size = sys.getsizeof(value)
+    if isinstance(value, str):
+        return size
+    for vector in [value.basepoint] + list(value.direction_vectors):
+        coordinates = vector.coordinates
+        size += sys.getsizeof(vector) + sys.getsizeof(coordinates)
+        if not hasattr(coordinates, 'nbytes'):
+            size += sum(sys.getsizeof(a) for a in coordinates)
+    return size
+
+
+class SolveCache(object):
+    """An LRU cache of solutions limited to max_entries and, if given, max_bytes.
+
+    compute_solution(system, ...) returns the cached solution of an equal
+    system, or solves it and caches the result. Solutions larger than
+    max_bytes on their own are returned without being cached.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=None, canonical=False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.canonical = canonical
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, system, engine, pivoting):
+        backend = vector.default_backend if system.is_array_backed() else system.backend()
+        return (system_digest(system, self.canonical), backend, engine, pivoting)
+
+    def get(self, key):
+        """The cached value for key, marked as most recently used, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        size = estimated_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.size += size
+        while (len(self.entries) > self.max_entries or
+               (self.max_bytes is not None and self.size > self.max_bytes)):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def compute_solution(self, system, engine=None, pivoting=None, **kwargs):
+        """system.compute_solution(engine, pivoting, **kwargs), from the cache when possible."""
+        if kwargs.get('copy', True) is False:
+            raise Exception(CACHE_NEEDS_COPY_MSG)
+        if engine is None:
+            engine = system.PLANES_ENGINE
+        key = self.key(system, engine, pivoting)
+        solution = self.get(key)
+        if solution is None:
+            solution = system.compute_solution(engine, pivoting, **kwargs)
+            self.put(key, solution)
+        return solution
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,315 @@
+"""Gaussian elimination on a dense augmented matrix.
+
+The functions in this module work in place on an m x (n+1) float array
+whose last column holds the constant terms, so a whole elimination costs
+one array instead of a fresh Plane per row operation.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TOLERANCE = 1e-10
+
+# Rows per trailing update in the blocked functions. Row blocks are also
+# the unit of work handed to worker threads, so results never depend on
+# the number of workers.
+BLOCK_ROWS = 512
+
+# Pivot selection strategies. NO_PIVOTING takes the first row with a
+# nonzero leading coefficient, PARTIAL_PIVOTING the row with the largest
+# one, and COMPLETE_PIVOTING the largest coefficient left in the whole
+# unreduced submatrix.
+NO_PIVOTING = None
+PARTIAL_PIVOTING = 'partial'
+COMPLETE_PIVOTING = 'complete'
+PIVOTING_MODES = (NO_PIVOTING, PARTIAL_PIVOTING, COMPLETE_PIVOTING)
+
+
+def check_pivoting(pivoting):
+    if pivoting not in PIVOTING_MODES:
+        raise ValueError('Unknown pivoting mode {!r}, expected one of {}'.format(
+            pivoting, PIVOTING_MODES))
+
+
+def triangular_form(matrix, tolerance=TOLERANCE, pivoting=NO_PIVOTING):
+    """Reduce the augmented matrix to row echelon form in place.
+
+    Returns the pivot column of each nonzero row, top to bottom.
+    Complete pivoting reorders the columns it pivots on, so it is only
+    offered by rref.
+    """
+    check_pivoting(pivoting)
+    if pivoting == COMPLETE_PIVOTING:
+        raise ValueError('Complete pivoting is only available for the reduced row echelon form')
+
+    num_equations, num_columns = matrix.shape
+    pivots = []
+    row = 0
+    for col in range(num_columns - 1):
+        if row == num_equations:
+            break
+        column = np.abs(matrix[row:, col])
+        if pivoting == PARTIAL_PIVOTING:
+            best = np.argmax(column)
+            if column[best] <= tolerance:
+                continue
+            pivot_row = row + best
+        else:
+            candidates = np.flatnonzero(column > tolerance)
+            if len(candidates) == 0:
+                continue
+            pivot_row = row + candidates[0]
+        if pivot_row != row:
+            matrix[[row, pivot_row]] = matrix[[pivot_row, row]]
+
+        factors = matrix[row+1:, col] / matrix[row, col]
+        matrix[row+1:, col:] -= np.outer(factors, matrix[row, col:])
+        matrix[row+1:, col] = 0
+        pivots.append(col)
+        row += 1
+    return pivots
+
+
+def back_substitution(matrix, pivots):
+    """Turn a row echelon form into reduced row echelon form in place."""
+    for row in range(len(pivots) - 1, -1, -1):
+        col = pivots[row]
+        matrix[row, col:] /= matrix[row, col]
+        matrix[row, col] = 1
+        factors = matrix[:row, col].copy()
+        matrix[:row, col:] -= np.outer(factors, matrix[row, col:])
+        matrix[:row, col] = 0
+
+
+def rref(matrix, tolerance=TOLERANCE, pivoting=NO_PIVOTING):
+    """Reduce the augmented matrix to reduced row echelon form in place.
+
+    Returns the pivot column of each nonzero row, top to bottom.
+    """
+    check_pivoting(pivoting)
+    if pivoting == COMPLETE_PIVOTING:
+        return complete_pivoting_rref(matrix, tolerance)
+
+    pivots = triangular_form(matrix, tolerance, pivoting)
+    back_substitution(matrix, pivots)
+    return pivots
+
+
+def complete_pivoting_rref(matrix, tolerance=TOLERANCE):
+    """Gauss-Jordan elimination pivoting on the largest remaining coefficient.
+
+    Rows are pivoted in order of decreasing coefficient size and sorted by
+    pivot column at the end, which leaves the unique RREF.
+    """
+    num_equations, num_columns = matrix.shape
+    free = np.ones(num_columns - 1, dtype=bool)
+    pivots = []
+    for row in range(num_equations):
+        candidates = np.abs(matrix[row:, :-1]) * free
+        pivot_row, col = np.unravel_index(np.argmax(candidates), candidates.shape)
+        if candidates[pivot_row, col] <= tolerance:
+            break
+        pivot_row += row
+        if pivot_row != row:
+            matrix[[row, pivot_row]] = matrix[[pivot_row, row]]
+
+        matrix[row] /= matrix[row, col]
+        matrix[row, col] = 1
+        factors = matrix[:, col].copy()
+        factors[row] = 0
+        matrix -= np.outer(factors, matrix[row])
+        matrix[:, col] = 0
+        matrix[row, col] = 1
+        free[col] = False
+        pivots.append(col)
+
+    order = np.argsort(pivots)
+    matrix[:len(pivots)] = matrix[order]
+    return sorted(pivots)
+
+
+def is_contradictory(matrix, pivots, tolerance=TOLERANCE):
+    """True if an echelon form has a row reading 0 = k with k nonzero."""
+    return bool(np.any(np.abs(matrix[len(pivots):, -1]) > tolerance))
+
+
+def indices_of_first_nonzero(matrix, tolerance=TOLERANCE):
+    """Column of the first entry above tolerance in each row, -1 for rows with none."""
+    nonzero = np.abs(matrix) >= tolerance
+    return np.where(nonzero.any(axis=1), nonzero.argmax(axis=1), -1)
+
+
+def parametrization(matrix, pivots):
+    """Basepoint and direction vectors of the solution set of an RREF.
+
+    Returns a 1-D basepoint array and a list of 1-D direction arrays, one
+    per free variable.
+    """
+    num_variables = matrix.shape[1] - 1
+    rank = len(pivots)
+
+    basepoint = np.zeros(num_variables)
+    basepoint[pivots] = matrix[:rank, -1]
+
+    direction_vectors = []
+    free_variables = sorted(set(range(num_variables)) - set(pivots))
+    for free_var in free_variables:
+        direction = np.zeros(num_variables)
+        direction[free_var] = 1
+        direction[pivots] = -matrix[:rank, free_var]
+        direction_vectors.append(direction)
+
+    return basepoint, direction_vectors
+
+
+def worker_pool(workers):
+    """A thread pool for workers > 1, or None to update blocks in turn."""
+    if workers is None or workers <= 1:
+        return None
+    return ThreadPoolExecutor(workers)
+
+
+def update_blocks(pool, first_row, last_row, block_rows, update):
+    """Call update(start_row, end_row) on every block of rows, in the pool if any."""
+    starts = range(first_row, last_row, block_rows)
+    blocks = [(start, min(start + block_rows, last_row)) for start in starts]
+    if pool is None or len(blocks) == 1:
+        for start_row, end_row in blocks:
+            update(start_row, end_row)
+    else:
+        # numpy releases the GIL in the products, so the threads overlap.
+        for future in [pool.submit(update, *block) for block in blocks]:
+            future.result()
+
+
+def blocked_triangular_form(matrix, tolerance=TOLERANCE, panel_size=64, block_rows=BLOCK_ROWS,
+                            start=(0, 0), pivots=None, checkpoint=None, workers=None):
+    """Row echelon form with partial pivoting, one panel of columns at a time.
+
+    Each panel is factored in memory from a copy of its columns, then the
+    rows below it are updated block_rows at a time with one matrix product
+    per block, spread over a pool of worker threads if workers > 1. Every
+    panel therefore makes a single pass over the trailing rows, which is
+    what makes this usable on a numpy.memmap. start and pivots resume an
+    interrupted reduction; checkpoint(row, col, pivots) is called after
+    each panel.
+    """
+    num_equations, num_columns = matrix.shape
+    num_variables = num_columns - 1
+    pivots = [] if pivots is None else list(pivots)
+    row, col = start
+    pool = worker_pool(workers)
+    try:
+        while row < num_equations and col < num_variables:
+            width = min(panel_size, num_variables - col)
+            panel_pivots, multipliers, top = factor_panel(matrix, row, col, width, tolerance)
+            rank = len(panel_pivots)
+
+            def update(start_row, end_row):
+                block = np.array(matrix[start_row:end_row, col:])
+                block -= multipliers[start_row-row-rank:end_row-row-rank].dot(top)
+                block[:, :width] = 0
+                matrix[start_row:end_row, col:] = block
+
+            if rank:
+                update_blocks(pool, row + rank, num_equations, block_rows, update)
+                matrix[row:row+rank, col:] = top
+
+            pivots.extend(panel_pivots)
+            row += rank
+            col += width
+            if checkpoint is not None:
+                checkpoint(row, col, pivots)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pivots
+
+
+def factor_panel(matrix, row, col, width, tolerance=TOLERANCE):
+    """Factor the panel matrix[row:, col:col+width] with partial pivoting.
+
+    Swaps the pivot rows into place in matrix and returns the pivot
+    columns, the multipliers of the rows below the pivot rows and the fully
+    reduced pivot rows (from column col on).
+    """
+    panel = np.array(matrix[row:, col:col+width])
+    panel_pivots = []
+    k = 0
+    for j in range(width):
+        if k == len(panel):
+            break
+        column = np.abs(panel[k:, j])
+        best = np.argmax(column)
+        if column[best] <= tolerance:
+            continue
+        pivot_row = k + best
+        if pivot_row != k:
+            panel[[k, pivot_row]] = panel[[pivot_row, k]]
+            matrix[[row+k, row+pivot_row]] = matrix[[row+pivot_row, row+k]]
+
+        # Keep the multipliers where the eliminated entries were.
+        factors = panel[k+1:, j] / panel[k, j]
+        panel[k+1:, j+1:] -= np.outer(factors, panel[k, j+1:])
+        panel[k+1:, j] = factors
+        panel_pivots.append(j)
+        k += 1
+
+    top = np.array(matrix[row:row+k, col:])
+    for t, j in enumerate(panel_pivots):
+        top[t+1:] -= np.outer(panel[t+1:k, j], top[t])
+        top[t+1:, j] = 0
+        top[t, :j] = 0
+
+    multipliers = panel[k:, panel_pivots]
+    return [col + j for j in panel_pivots], multipliers, top
+
+
+def blocked_back_substitution(matrix, pivots, panel_size=64, block_rows=BLOCK_ROWS,
+                              remaining=None, checkpoint=None, workers=None):
+    """Turn a row echelon form into RREF, panel_size pivot rows at a time.
+
+    Panels are handled bottom up: each is reduced in memory and then
+    cleared from the rows above it block_rows at a time, by worker
+    threads if workers > 1. remaining resumes an interrupted pass (the
+    number of pivot rows not yet reduced); checkpoint(remaining) is called
+    after each panel.
+    """
+    end = len(pivots) if remaining is None else remaining
+    pool = worker_pool(workers)
+    try:
+        while end > 0:
+            start = max(end - panel_size, 0)
+            first_col = pivots[start]
+            panel = np.array(matrix[start:end, first_col:])
+            columns = [p - first_col for p in pivots[start:end]]
+            for i in range(end - start - 1, -1, -1):
+                col = columns[i]
+                panel[i] /= panel[i, col]
+                panel[i, col] = 1
+                panel[:i] -= np.outer(panel[:i, col], panel[i])
+                panel[:i, col] = 0
+            matrix[start:end, first_col:] = panel
+
+            def update(start_row, end_row):
+                block = np.array(matrix[start_row:end_row, first_col:])
+                block -= block[:, columns].dot(panel)
+                block[:, columns] = 0
+                matrix[start_row:end_row, first_col:] = block
+
+            update_blocks(pool, 0, start, block_rows, update)
+            end = start
+            if checkpoint is not None:
+                checkpoint(end)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def blocked_rref(matrix, tolerance=TOLERANCE, panel_size=64, block_rows=BLOCK_ROWS,
+                 workers=None):
+    """Reduced row echelon form with blocked elimination; see blocked_triangular_form."""
+    pivots = blocked_triangular_form(matrix, tolerance, panel_size, block_rows,
+                                     workers=workers)
+    blocked_back_substitution(matrix, pivots, panel_size, block_rows, workers=workers)
+    return pivots
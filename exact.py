@@ -0,0 +1,127 @@
+"""Exact elimination over the rationals.
+
+Augmented matrices are lists of rows. Every row is scaled to integers
+and reduced with fraction-free (Bareiss) Gauss-Jordan elimination: the
+update a_ij <- (p a_ij - a_ik a_rj) / p_prev always divides exactly, so
+entries stay integers no larger than the minors of the matrix, and no
+tolerance is involved in choosing pivots or spotting contradictions.
+"""
+from fractions import Fraction
+from math import gcd
+
+
+def integer_rows(matrix):
+    """
+    Copy of matrix with every row scaled to integers by its common
+    denominator. Returns the rows and the denominators used.
+    """
+    rows, denominators = [], []
+    for row in matrix:
+        row = [Fraction(a) for a in row]
+        denominator = 1
+        for a in row:
+            denominator = denominator * a.denominator // gcd(denominator, a.denominator)
+        rows.append([int(a * denominator) for a in row])
+        denominators.append(denominator)
+    return rows, denominators
+
+
+def bareiss(rows, num_columns=None, reduced=True):
+    """
+    Fraction-free elimination in place on a list of integer rows.
+
+    Eliminates the first num_columns columns (default: all but the
+    last), above the pivots as well when reduced is set; the pivots of a
+    reduced matrix all end up equal to the last one. Returns the pivot
+    columns and the last pivot, negated after an odd number of row
+    swaps: for a square matrix of full rank, its determinant.
+    """
+    if num_columns is None:
+        num_columns = len(rows[0]) - 1
+    previous = 1
+    sign = 1
+    pivots = []
+    row = 0
+    for col in range(num_columns):
+        if row == len(rows):
+            break
+        pivot_row = next((i for i in range(row, len(rows)) if rows[i][col]), None)
+        if pivot_row is None:
+            continue
+        if pivot_row != row:
+            rows[row], rows[pivot_row] = rows[pivot_row], rows[row]
+            sign = -sign
+        pivot = rows[row]
+        p = pivot[col]
+
+        targets = range(len(rows)) if reduced else range(row + 1, len(rows))
+        for i in targets:
+            if i == row:
+                continue
+            current = rows[i]
+            factor = current[col]
+            if factor:
+                current[:] = [(p * a - factor * b) // previous
+                              for a, b in zip(current, pivot)]
+            elif p != previous:
+                current[:] = [p * a // previous for a in current]
+        pivots.append(col)
+        previous = p
+        row += 1
+    return pivots, sign * previous
+
+
+def rref(matrix):
+    """
+    Exact RREF of an augmented matrix of numbers convertible to Fraction.
+    Returns the rows as Fractions and the pivot columns.
+    """
+    rows, _ = integer_rows(matrix)
+    pivots, _ = bareiss(rows)
+    # Every row was scaled up by the same final pivot (rows below the
+    # pivots only ever hold 0 = k, which just needs k to stay nonzero).
+    p = rows[len(pivots) - 1][pivots[-1]] if pivots else 1
+    return [[Fraction(a, p) for a in row] for row in rows], pivots
+
+
+def triangular_form(matrix):
+    """Exact row echelon form and the pivot columns."""
+    rows, _ = integer_rows(matrix)
+    pivots, _ = bareiss(rows, reduced=False)
+    return [[Fraction(a) for a in row] for row in rows], pivots
+
+
+def determinant(matrix):
+    """Exact determinant of a square matrix (no constant column)."""
+    rows, denominators = integer_rows(matrix)
+    pivots, determinant = bareiss(rows, len(rows), reduced=False)
+    if len(pivots) < len(rows):
+        return Fraction(0)
+    for denominator in denominators:
+        determinant = Fraction(determinant, denominator)
+    return Fraction(determinant)
+
+
+def is_contradictory(matrix, pivots):
+    """Whether a row past the pivots reads 0 = k with k nonzero."""
+    return any(row[-1] != 0 for row in matrix[len(pivots):])
+
+
+def parametrization(matrix, pivots):
+    """
+    Basepoint and direction vectors (lists of Fractions) of a matrix in
+    RREF, one direction per free variable.
+    """
+    num_variables = len(matrix[0]) - 1
+    basepoint = [Fraction(0)] * num_variables
+    for row, col in zip(matrix, pivots):
+        basepoint[col] = row[-1]
+
+    direction_vectors = []
+    for free in sorted(set(range(num_variables)) - set(pivots)):
+        direction = [Fraction(0)] * num_variables
+        direction[free] = Fraction(1)
+        for row, col in zip(matrix, pivots):
+            direction[col] = -row[free]
+        direction_vectors.append(direction)
+    return basepoint, direction_vectors
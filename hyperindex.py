@@ -0,0 +1,190 @@
+import numpy as np
+
+from vector import NUMPY
+
+# Relative slack on every distance bound: u . x and n . x - c round
+# differently, by up to a few ulps of |x| and the offsets.
+SLACK = 1e-9
+# Buckets only prune when they hold enough members each and a query only
+# has to look into a few of them; otherwise one vectorized pass over every
+# hyperplane is faster than visiting buckets one by one.
+MIN_BUCKET_SIZE = 16
+MAX_SCANNED_BUCKETS = 32
+
+
+class HyperplaneIndex(object):
+    """Index over a collection of hyperplanes for nearest and side-of queries.
+
+    Every hyperplane n . x = c is stored with its unit normal and offset
+    c / |n|, so its distance to a point x is |n . x - c| / |n|. Hyperplanes
+    are bucketed by the direction of their normal; inside a bucket they are
+    sorted by offset. For a query point a bucket with representative
+    direction u and angular spread delta bounds the distance of each member
+    from below by |u . x - offset| - delta |x|, so only the few members
+    around u . x are ever checked exactly. This pays off when the normals
+    share a small number of directions; with generic normals the buckets
+    are too many and too wide to prune, and queries scan every hyperplane
+    in one vectorized pass instead.
+    """
+
+    ZERO_NORMAL_MSG = 'Cannot index a hyperplane with a zero normal vector'
+
+    def __init__(self, hyperplanes, resolution=8):
+        hyperplanes = list(hyperplanes)
+        normals = np.array([p.normal_vector.coordinates_for(NUMPY) for p in hyperplanes])
+        constants = np.array([float(p.constant_term) for p in hyperplanes])
+        self.build(normals, constants, resolution)
+
+    @classmethod
+    def from_arrays(cls, normals, constants, resolution=8):
+        index = cls.__new__(cls)
+        index.build(np.array(normals, dtype=np.float64),
+                    np.array(constants, dtype=np.float64), resolution)
+        return index
+
+    def build(self, normals, constants, resolution):
+        magnitudes = np.linalg.norm(normals, axis=1)
+        if np.any(magnitudes == 0):
+            raise Exception(self.ZERO_NORMAL_MSG)
+        self.normals = normals
+        self.constants = constants
+        self.dimension = normals.shape[1]
+
+        # n . x = c and -n . x = -c are the same hyperplane: orient every
+        # unit normal so that its first nonzero coordinate is positive.
+        unit_normals = normals / magnitudes[:, np.newaxis]
+        offsets = constants / magnitudes
+        first_nonzero = np.argmax(np.abs(unit_normals) > 1e-12, axis=1)
+        signs = np.sign(unit_normals[np.arange(len(normals)), first_nonzero])
+        unit_normals *= signs[:, np.newaxis]
+        offsets *= signs
+
+        keys = np.round(unit_normals * resolution).astype(np.int64)
+        _, bucket_of = np.unique(keys, axis=0, return_inverse=True)
+        bucket_of = bucket_of.reshape(-1)
+
+        # Every hyperplane laid out bucket after bucket, sorted by offset
+        # inside its bucket; each bucket is a slice of these arrays.
+        self.members = np.lexsort((offsets, bucket_of))
+        self.all_offsets = offsets[self.members]
+        self.all_unit_normals = unit_normals[self.members]
+        sizes = np.bincount(bucket_of)
+        self.bucket_ends = np.cumsum(sizes)
+        self.bucket_starts = self.bucket_ends - sizes
+
+        directions = np.add.reduceat(self.all_unit_normals, self.bucket_starts)
+        directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+        deviations = np.linalg.norm(self.all_unit_normals - np.repeat(directions, sizes, axis=0),
+                                    axis=1)
+        self.directions = directions
+        self.spreads = np.maximum.reduceat(deviations, self.bucket_starts)
+        self.buckets = [(self.members[start:end], self.all_offsets[start:end],
+                         self.all_unit_normals[start:end])
+                        for start, end in zip(self.bucket_starts, self.bucket_ends)]
+        self.scan_only = len(self.buckets) * MIN_BUCKET_SIZE > len(normals)
+
+        # The offsets shifted bucket by bucket onto one sorted axis, so one
+        # searchsorted call locates a query in every bucket at once.
+        self.low, span = offsets.min(), np.ptp(offsets) + 1
+        self.span = span
+        self.largest_offset = np.abs(offsets).max()
+        self.all_keys = np.repeat(np.arange(len(sizes)), sizes) * span + self.all_offsets - self.low
+
+    def distances(self, point, indices):
+        """Exact distances from one point to the given hyperplanes."""
+        normals = self.normals[indices]
+        return np.abs(normals.dot(point) - self.constants[indices]) / np.linalg.norm(normals, axis=1)
+
+    def nearest(self, points, k=1):
+        """
+        The k hyperplanes closest to each of a batch of points.
+
+        Returns two P x k arrays: the indices of the hyperplanes (in the
+        order they were given) and their distances, nearest first.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        k = min(k, len(self.normals))
+        indices = np.empty((len(points), k), dtype=np.intp)
+        distances = np.empty((len(points), k))
+        for row, point in enumerate(points):
+            best = self.nearest_to_point(point, k)
+            indices[row] = [i for _, i in best]
+            distances[row] = [d for d, _ in best]
+        return indices, distances
+
+    def scan(self, point, k):
+        """The k nearest hyperplanes to point, checking every one of them."""
+        distances = np.abs(self.all_unit_normals.dot(point) - self.all_offsets)
+        keep = np.argpartition(distances, k - 1)[:k]
+        order = np.argsort(distances[keep], kind='stable')
+        return list(zip(distances[keep][order], self.members[keep][order]))
+
+    def nearest_to_point(self, point, k):
+        if self.scan_only:
+            return self.scan(point, k)
+        targets = self.directions.dot(point)
+        slack = SLACK * (np.linalg.norm(point) + self.largest_offset + 1)
+        errors = self.spreads * np.linalg.norm(point) + slack
+
+        # Lower bound on the distance to anything in each bucket, from the
+        # members whose offsets are on either side of the bucket's target.
+        clipped = np.clip(targets - self.low, 0, self.span - 1)
+        keys = np.arange(len(self.buckets)) * self.span + clipped
+        positions = np.searchsorted(self.all_keys, keys)
+        below = np.maximum(positions - 1, self.bucket_starts)
+        above = np.minimum(positions, self.bucket_ends - 1)
+        bounds = np.minimum(np.abs(self.all_offsets[below] - targets),
+                            np.abs(self.all_offsets[above] - targets)) - errors
+        order = np.argsort(bounds)
+
+        # Any k members give an upper bound on the k-th distance; take the
+        # ones nearest by offset in the most promising bucket. They stay
+        # candidates, so rounding at the edges of a window can never leave
+        # fewer than k.
+        members, offsets, unit_normals = self.buckets[order[0]]
+        position = np.searchsorted(offsets, targets[order[0]])
+        start = max(min(position - k, len(offsets) - 2 * k), 0)
+        window = slice(start, start + 2 * k)
+        best_indices = members[window]
+        best_distances = np.abs(unit_normals[window].dot(point) - offsets[window])
+        radius = np.inf
+        if len(best_distances) >= k:
+            radius = np.sort(best_distances)[k - 1]
+
+        candidates = order[:np.count_nonzero(bounds <= radius)]
+        if len(candidates) > MAX_SCANNED_BUCKETS:
+            return self.scan(point, k)
+
+        # Only the members within radius of each bucket's target can beat
+        # the k found so far; gather them all and pick the best once.
+        indices, distances = [best_indices], [best_distances]
+        for bucket in candidates:
+            members, offsets, unit_normals = self.buckets[bucket]
+            target, error = targets[bucket], errors[bucket]
+            start = np.searchsorted(offsets, target - radius - error)
+            end = np.searchsorted(offsets, target + radius + error, side='right')
+            indices.append(members[start:end])
+            distances.append(np.abs(unit_normals[start:end].dot(point) - offsets[start:end]))
+        best_indices, unique = np.unique(np.concatenate(indices), return_index=True)
+        best_distances = np.concatenate(distances)[unique]
+        if len(best_distances) > k:
+            keep = np.argpartition(best_distances, k - 1)[:k]
+            best_indices, best_distances = best_indices[keep], best_distances[keep]
+
+        order = np.argsort(best_distances, kind='stable')
+        return list(zip(best_distances[order], best_indices[order]))
+
+    def side(self, points, indices=None):
+        """
+        Which side of each hyperplane each point lies on: the sign of
+        n . x - c as a P x N array (or P x len(indices)), 0 meaning on it.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        if indices is None:
+            normals, constants = self.normals, self.constants
+        else:
+            normals, constants = self.normals[indices], self.constants[indices]
+        return np.sign(points.dot(normals.T) - constants).astype(np.int8)
+
+    def __len__(self):
+        return len(self.normals)
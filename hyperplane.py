@@ -1,5 +1,7 @@
 from decimal import Decimal, getcontext
-from vector import Vector
+import numbers
+
+from vector import Vector, to_scalar, is_near_zero, index_of_first_nonzero
 
 getcontext().prec = 30
 
@@ -11,6 +13,9 @@ class MyDecimal(Decimal):
 
 class Hyperplane(object):
 
+    __slots__ = ('dimension', 'normal_vector', 'constant_term', '_basepoint',
+                 'current')
+
     NO_NONZERO_ELTS_FOUND_MSG = 'No nonzero elements found'
     EITHER_DIM_OR_NORMAL_VEC_MUST_BE_PROVIDED_MSG = (
         'Either the dimension of the hyperplane or the normal vector '
@@ -30,28 +35,41 @@ class Hyperplane(object):
         self.normal_vector = normal_vector
 
         if not constant_term:
-            constant_term = Decimal('0')
-        self.constant_term = Decimal(constant_term)
+            constant_term = '0'
+        self.constant_term = to_scalar(constant_term, normal_vector.backend)
 
-        self.set_basepoint()
+    @property
+    def basepoint(self):
+        """A point on the hyperplane, worked out the first time it is needed."""
+        try:
+            return self._basepoint
+        except AttributeError:
+            self.set_basepoint()
+            return self._basepoint
 
     def set_basepoint(self):
-        try:
-            n = self.normal_vector
-            c = self.constant_term
-            basepoint_coords = ['0'] * self.dimension
+        n = self.normal_vector
+        c = self.constant_term
+        basepoint_coords = ['0'] * self.dimension
+
+        initial_index = index_of_first_nonzero(n.coordinates)
+        if initial_index < 0:
+            self._basepoint = None
+            return
 
-            initial_index = Hyperplane.first_nonzero_index(n)
-            initial_coefficient = n[initial_index]
+        initial_coefficient = n[initial_index]
 
-            basepoint_coords[initial_index] = c / initial_coefficient
-            self.basepoint = Vector(basepoint_coords)
+        basepoint_coords[initial_index] = c / initial_coefficient
+        self._basepoint = Vector(basepoint_coords, n.backend)
 
-        except Exception as e:
-            if str(e) == Hyperplane.NO_NONZERO_ELTS_FOUND_MSG:
-                self.basepoint = None
-            else:
-                raise e
+    def set_equation(self, normal_vector, constant_term):
+        """Change the coefficients in place; the basepoint is worked out again when needed."""
+        self.normal_vector = normal_vector
+        self.constant_term = to_scalar(constant_term, normal_vector.backend)
+        try:
+            del self._basepoint
+        except AttributeError:
+            pass
 
     def __str__(self):
 
@@ -79,8 +97,10 @@ class Hyperplane(object):
 
         n = self.normal_vector
 
-        try:
-            initial_index = Hyperplane.first_nonzero_index(n)
+        initial_index = index_of_first_nonzero(n.coordinates)
+        if initial_index < 0:
+            output = '0'
+        else:
             terms = [write_coefficient(
                      n[i], is_initial_term=(i == initial_index)) +
                      'x_{}'.format(i + 1)
@@ -88,12 +108,6 @@ class Hyperplane(object):
                      if round(n[i], num_decimal_places) != 0]
             output = ' '.join(terms)
 
-        except Exception as e:
-            if str(e) == self.NO_NONZERO_ELTS_FOUND_MSG:
-                output = '0'
-            else:
-                raise e
-
         constant = round(self.constant_term, num_decimal_places)
         if constant % 1 == 0:
             constant = int(constant)
@@ -110,7 +124,7 @@ class Hyperplane(object):
                 return False
 
             diff = self.constant_term - plane2.constant_term
-            return MyDecimal(diff).is_near_zero()
+            return is_near_zero(diff)
 
         elif plane2.normal_vector.is_zero():
             return False
@@ -121,6 +135,23 @@ class Hyperplane(object):
         basepoint_difference = self.basepoint.minus(plane2.basepoint)
         return basepoint_difference.is_orthogonal(self.normal_vector)
 
+    def __add__(self, plane2):
+        """Adds two hyperplanes together"""
+        return Hyperplane(normal_vector=self.normal_vector + plane2.normal_vector,
+                          constant_term=self.constant_term + plane2.constant_term)
+
+    def __sub__(self, plane2):
+        """Subtract one Hyperplane from another Hyperplane"""
+        return Hyperplane(normal_vector=self.normal_vector - plane2.normal_vector,
+                          constant_term=self.constant_term - plane2.constant_term)
+
+    def __mul__(self, coefficient):
+        if isinstance(coefficient, (numbers.Real, Decimal)):
+            return Hyperplane(normal_vector=self.normal_vector * coefficient,
+                              constant_term=self.constant_term * coefficient)
+        else:
+            raise TypeError('value must be a number')
+
     def __iter__(self):
         self.current = 0
         return self
@@ -141,7 +172,7 @@ class Hyperplane(object):
 
     @staticmethod
     def first_nonzero_index(iterable):
-        for k, item in enumerate(iterable):
-            if not MyDecimal(item).is_near_zero():
-                return k
-        raise Exception(Hyperplane.NO_NONZERO_ELTS_FOUND_MSG)
\ No newline at end of file
+        index = index_of_first_nonzero(iterable)
+        if index < 0:
+            raise Exception(Hyperplane.NO_NONZERO_ELTS_FOUND_MSG)
+        return index
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""A linear system that is kept factored while equations come and go.
+
+IncrementalLinearSystem keeps the triangular factor R of A^T A = R^T R
+together with z = A^T b and b^T b. Appending an equation rotates it into
+R with Givens rotations, removing one downdates R with the LINPACK
+Cholesky downdate, and changing a constant term only touches z, so each
+change costs O(n^2) instead of a fresh O(m n^2) elimination. Solutions
+come from the corrected semi-normal equations: x from R^T R x = z, then
+one step of refinement with the stored rows.
+"""
+from math import sqrt
+
+import numpy as np
+
+import linsys
+from vector import Vector, NUMPY
+
+TOLERANCE = 1e-10
+
+
+def solve_upper(upper, y):
+    """Solve R x = y for an upper triangular R by back substitution."""
+    x = np.array(y, dtype=np.float64)
+    for row in range(len(x) - 1, -1, -1):
+        x[row] -= upper[row, row+1:].dot(x[row+1:])
+        x[row] /= upper[row, row]
+    return x
+
+
+def solve_upper_transpose(upper, y):
+    """Solve R^T x = y for an upper triangular R by forward substitution."""
+    x = np.array(y, dtype=np.float64)
+    for row in range(len(x)):
+        x[row] -= upper[:row, row].dot(x[:row])
+        x[row] /= upper[row, row]
+    return x
+
+
+def givens_update(upper, row):
+    """Replace R by the triangular factor of [R; row], in place."""
+    row = np.array(row, dtype=np.float64)
+    for k in range(len(row)):
+        if row[k] == 0:
+            continue
+        r = np.hypot(upper[k, k], row[k])
+        c, s = upper[k, k] / r, row[k] / r
+        top = upper[k, k:].copy()
+        upper[k, k:] = c * top + s * row[k:]
+        row[k:] = c * row[k:] - s * top
+
+
+def cholesky_downdate(upper, row):
+    """
+    Replace R by the triangular factor of R^T R - row row^T, in place
+    (LINPACK dchdd). Returns False, leaving R untouched, when the result
+    would not be positive definite.
+    """
+    p = solve_upper_transpose(upper, row)
+    remainder = 1 - p.dot(p)
+    if not np.all(np.isfinite(p)) or remainder <= TOLERANCE:
+        return False
+    alpha = sqrt(remainder)
+
+    n = len(row)
+    cosines, sines = np.empty(n), np.empty(n)
+    for i in range(n - 1, -1, -1):
+        scale = alpha + abs(p[i])
+        a, b = alpha / scale, p[i] / scale
+        norm = sqrt(a * a + b * b)
+        cosines[i], sines[i] = a / norm, b / norm
+        alpha = scale * norm
+
+    carried = np.zeros(n)
+    for i in range(n - 1, -1, -1):
+        top, rest = upper[i, i:].copy(), carried[i:]
+        upper[i, i:] = cosines[i] * top - sines[i] * rest
+        carried[i:] = cosines[i] * rest + sines[i] * top
+    return True
+
+
+class IncrementalLinearSystem(object):
+    """A system of equations that can be appended to, trimmed and re-solved.
+
+    Equations are Plane, Line or Hyperplane objects as in LinearSystem.
+    When the coefficients stop having full column rank (fewer equations
+    than variables, or dependent ones) the solution falls back to the
+    dense engine, which also describes infinitely many solutions.
+    """
+
+    ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG = linsys.LinearSystem.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG
+    NO_EQUATIONS_MSG = 'The system has no equations'
+
+    def __init__(self, dimension, planes=(), tolerance=TOLERANCE):
+        self.dimension = dimension
+        self.tolerance = tolerance
+        self.planes = []
+        self.rows = []
+        self.upper = np.zeros((dimension, dimension))
+        self.moment = np.zeros(dimension)
+        self.constants_squared = 0.0
+        for plane in planes:
+            self.append(plane)
+
+    @classmethod
+    def from_linear_system(cls, system, tolerance=TOLERANCE):
+        return cls(system.dimension, system.planes, tolerance)
+
+    def append(self, plane):
+        """Add an equation at the end of the system."""
+        if plane.dimension != self.dimension:
+            raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
+        row = np.array(plane.normal_vector.coordinates_for(NUMPY), dtype=np.float64)
+        constant = float(plane.constant_term)
+        self.planes.append(plane)
+        self.rows.append(row)
+        givens_update(self.upper, row)
+        self.moment += constant * row
+        self.constants_squared += constant * constant
+
+    def remove(self, index=0):
+        """Remove an equation (by default the oldest) and return it."""
+        plane = self.planes.pop(index)
+        row = self.rows.pop(index)
+        constant = float(plane.constant_term)
+        self.moment -= constant * row
+        self.constants_squared -= constant * constant
+        if not self.has_full_rank() or not cholesky_downdate(self.upper, row):
+            self.refactor()
+        return plane
+
+    def set_constant_term(self, index, constant_term):
+        """Change the constant term of one equation; R stays as it is."""
+        plane = self.planes[index]
+        new_plane = type(plane)(normal_vector=plane.normal_vector, constant_term=constant_term)
+        change = float(new_plane.constant_term) - float(plane.constant_term)
+        self.moment += change * self.rows[index]
+        self.constants_squared += (float(new_plane.constant_term) ** 2 -
+                                   float(plane.constant_term) ** 2)
+        self.planes[index] = new_plane
+
+    def refactor(self):
+        """Recompute R from the stored equations."""
+        self.upper = np.zeros((self.dimension, self.dimension))
+        if self.rows:
+            factor = np.linalg.qr(np.array(self.rows), mode='r')
+            self.upper[:len(factor)] = factor
+
+    def has_full_rank(self):
+        diagonal = np.abs(np.diag(self.upper))
+        return len(self.rows) >= self.dimension and diagonal.min() > self.tolerance * max(diagonal.max(), 1)
+
+    def to_matrix(self):
+        matrix = np.empty((len(self), self.dimension + 1))
+        matrix[:, :-1] = self.rows
+        matrix[:, -1] = [float(p.constant_term) for p in self.planes]
+        return matrix
+
+    def to_linear_system(self):
+        return linsys.LinearSystem(list(self.planes))
+
+    def compute_least_squares_solution(self, refine=True):
+        """
+        Best-fit solution and residual norm from the maintained factor.
+        Without refine only O(n^2) work is done, and the residual norm
+        comes from b^T b - z^T x (accurate to about sqrt(eps) |b|).
+        """
+        x = solve_upper(self.upper, solve_upper_transpose(self.upper, self.moment))
+        if refine:
+            matrix = self.to_matrix()
+            residual = matrix[:, -1] - matrix[:, :-1].dot(x)
+            x += solve_upper(self.upper, solve_upper_transpose(
+                self.upper, matrix[:, :-1].T.dot(residual)))
+            residual_norm = np.linalg.norm(matrix[:, -1] - matrix[:, :-1].dot(x))
+        else:
+            residual_norm = sqrt(max(self.constants_squared - self.moment.dot(x), 0.0))
+        return x, float(residual_norm)
+
+    def compute_solution(self, refine=True):
+        """
+        Return a Parametrization, or LinearSystem.NO_SOLUTIONS_MSG when
+        the residual of the best fit is not zero, like
+        LinearSystem.compute_solution.
+        """
+        if not self.planes:
+            raise Exception(self.NO_EQUATIONS_MSG)
+        if not self.has_full_rank():
+            system = linsys.LinearSystem.from_array(self.to_matrix())
+            return system.compute_solution(engine=linsys.LinearSystem.DENSE_ENGINE)
+
+        x, residual_norm = self.compute_least_squares_solution(refine)
+        scale = max(1.0, sqrt(self.constants_squared))
+        tolerance = self.tolerance if refine else sqrt(self.tolerance)
+        if residual_norm > tolerance * scale:
+            return linsys.LinearSystem.NO_SOLUTIONS_MSG
+        return linsys.Parametrization(Vector(list(x)), [])
+
+    def __len__(self):
+        return len(self.planes)
+
+    def __getitem__(self, i):
+        return self.planes[i]
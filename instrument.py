@@ -0,0 +1,150 @@
+"""Opt-in counters and phase timers for LinearSystem solves.
+
+Instrumentation is off until a Stats object is made active:
+
+    with instrument.collect() as stats:
+        system.compute_solution()
+    stats.as_dict()
+
+Instrumented code checks the module-level `active` once per operation
+and does nothing else while it is None, so there is no cost beyond that
+test when collection is off. Counters are incremented by name (see
+COUNTERS); phases time whole steps of a solve and nest, so the time of a
+phase includes that of the phases it calls.
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+# Counters the LinearSystem row operations and pivot searches report.
+ROW_SWAPS = 'row_swaps'
+ROW_OPS = 'row_ops'
+ALLOCATIONS = 'allocations'
+PIVOTS_TESTED = 'pivots_tested'
+ZERO_TESTS = 'zero_tests'
+COUNTERS = (ROW_SWAPS, ROW_OPS, ALLOCATIONS, PIVOTS_TESTED, ZERO_TESTS)
+
+# Phases of a solve.
+TRIANGULAR = 'triangular'
+RREF = 'rref'
+PARAMETRIZATION = 'parametrization'
+FACTORIZATION = 'factorization'
+
+active = None
+
+
+class Stats(object):
+    """Counters, phase timers and hooks for one or more solves.
+
+    Hooks are called as hook(kind, name, value): kind is 'count' with the
+    increment as value, or 'phase' with the seconds a phase took.
+    """
+
+    def __init__(self, hooks=()):
+        self.counters = Counter()
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.hooks = list(hooks)
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+        for hook in self.hooks:
+            hook('count', name, n)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] += elapsed
+            self.calls[name] += 1
+            for hook in self.hooks:
+                hook('phase', name, elapsed)
+
+    def reset(self):
+        self.counters.clear()
+        self.seconds.clear()
+        self.calls.clear()
+
+    def as_dict(self):
+        return {
+            'counters': dict((name, self.counters[name]) for name in
+                             sorted(set(COUNTERS) | set(self.counters))),
+            'phases': dict((name, {'seconds': self.seconds[name], 'calls': self.calls[name]})
+                           for name in sorted(self.calls)),
+        }
+
+    def metrics(self, prefix='linsys'):
+        """The stats as a flat {metric name: number} dict for a metrics pipeline."""
+        stats = self.as_dict()
+        flat = {}
+        for name, value in stats['counters'].items():
+            flat['{}.{}'.format(prefix, name)] = value
+        for name, timing in stats['phases'].items():
+            flat['{}.phase.{}.seconds'.format(prefix, name)] = timing['seconds']
+            flat['{}.phase.{}.calls'.format(prefix, name)] = timing['calls']
+        return flat
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+@contextmanager
+def no_phase():
+    yield
+
+
+def phase(name):
+    """Time a phase in the active Stats; a no-op context when there is none."""
+    if active is None:
+        return no_phase()
+    return active.phase(name)
+
+
+def timed(name):
+    """Decorator timing every call of a function as phase name."""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return function(*args, **kwargs)
+            with active.phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(stats=None):
+    """Make stats (or a new Stats) active and return it."""
+    global active
+    active = Stats() if stats is None else stats
+    return active
+
+
+def disable():
+    global active
+    active = None
+
+
+@contextmanager
+def collect(stats=None):
+    """Collect into stats (or a new Stats) inside the block, then restore the previous one."""
+    global active
+    previous = active
+    if stats is None:
+        stats = Stats()
+    active = stats
+    try:
+        yield stats
+    finally:
+        active = previous
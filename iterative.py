@@ -0,0 +1,296 @@
+"""Iterative solvers for large square linear systems.
+
+Each solver takes an operator built by as_operator (from a LinearSystem, a
+SparseLinearSystem or a plain coefficient array) and returns an
+IterativeResult describing the solution and how the iteration converged.
+"""
+from math import sqrt
+
+import numpy as np
+
+import linsys
+import sparse
+from vector import Vector
+
+TOLERANCE = 1e-10
+
+CONJUGATE_GRADIENT = 'cg'
+GMRES = 'gmres'
+BICGSTAB = 'bicgstab'
+JACOBI = 'jacobi'
+GAUSS_SEIDEL = 'gauss_seidel'
+
+# Built-in preconditioners; any callable mapping a residual to an
+# approximate solution of A z = r may be passed instead.
+JACOBI_PRECONDITIONER = 'jacobi'
+
+ZERO_DIAGONAL_MSG = ('Jacobi and Gauss-Seidel need a nonzero diagonal coefficient '
+                     'in every equation')
+
+
+class IterativeResult(object):
+
+    def __init__(self, solution, converged, iterations, residual_norm, residual_history):
+        self.solution = solution
+        self.converged = converged
+        self.iterations = iterations
+        self.residual_norm = residual_norm
+        self.residual_history = residual_history
+
+    def as_parametrization(self):
+        """The solution in the form LinearSystem.compute_solution returns."""
+        return linsys.Parametrization(self.solution, [])
+
+    def __str__(self):
+        return '{} after {} iterations, residual norm {:.3e}'.format(
+            'Converged' if self.converged else 'Did not converge',
+            self.iterations, self.residual_norm)
+
+
+class DenseOperator(object):
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.shape = matrix.shape
+
+    def matvec(self, x):
+        return self.matrix.dot(x)
+
+    def diagonal(self):
+        return np.diag(self.matrix).copy()
+
+    def gauss_seidel_sweep(self, x, b):
+        for i in range(self.shape[0]):
+            row = self.matrix[i]
+            x[i] += (b[i] - row.dot(x)) / row[i]
+
+
+class SparseOperator(object):
+    """Compressed sparse row view of a SparseLinearSystem."""
+
+    def __init__(self, system):
+        self.shape = (len(system), system.dimension)
+        lengths = [len(row) for row in system.rows]
+        self.indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.intp)
+        self.indices = np.fromiter((col for row in system.rows for col in row),
+                                   dtype=np.intp, count=self.indptr[-1])
+        self.data = np.fromiter((value for row in system.rows for value in row.values()),
+                                dtype=np.float64, count=self.indptr[-1])
+        self.row_ids = np.repeat(np.arange(self.shape[0]), lengths)
+
+    def matvec(self, x):
+        return np.bincount(self.row_ids, weights=self.data * x[self.indices],
+                           minlength=self.shape[0])
+
+    def diagonal(self):
+        diagonal = np.zeros(self.shape[0])
+        on_diagonal = self.indices == self.row_ids
+        diagonal[self.row_ids[on_diagonal]] = self.data[on_diagonal]
+        return diagonal
+
+    def gauss_seidel_sweep(self, x, b):
+        for i in range(self.shape[0]):
+            start, end = self.indptr[i], self.indptr[i+1]
+            cols, values = self.indices[start:end], self.data[start:end]
+            diagonal = values[cols == i][0]
+            x[i] += (b[i] - values.dot(x[cols])) / diagonal
+
+
+def as_operator(system):
+    """Return (operator, constant terms) for a system or coefficient array."""
+    if isinstance(system, sparse.SparseLinearSystem):
+        return SparseOperator(system), np.array(system.constant_terms)
+    elif isinstance(system, linsys.LinearSystem):
+        matrix = system.to_matrix()
+        return DenseOperator(matrix[:, :-1]), matrix[:, -1].copy()
+    else:
+        matrix = np.asarray(system, dtype=np.float64)
+        return DenseOperator(matrix[:, :-1]), matrix[:, -1].copy()
+
+
+def make_preconditioner(operator, preconditioner):
+    if preconditioner is None:
+        return lambda r: r
+    elif preconditioner == JACOBI_PRECONDITIONER:
+        inverse_diagonal = 1 / nonzero_diagonal(operator)
+        return lambda r: inverse_diagonal * r
+    elif callable(preconditioner):
+        return preconditioner
+    raise ValueError('Unknown preconditioner {!r}'.format(preconditioner))
+
+
+def solve(system, method=CONJUGATE_GRADIENT, tolerance=TOLERANCE, max_iterations=None,
+          preconditioner=None, initial_guess=None, restart=30):
+    """Solve a square system iteratively with the named method.
+
+    Iteration stops once the residual norm drops below tolerance times the
+    norm of the constant terms, or after max_iterations (default 10 n).
+    """
+    operator, b = as_operator(system)
+    num_equations, num_variables = operator.shape
+    if num_equations != num_variables:
+        raise Exception('Iterative solvers need as many equations as variables')
+    if max_iterations is None:
+        max_iterations = 10 * num_variables
+    if initial_guess is None:
+        x = np.zeros(num_variables)
+    else:
+        x = np.array([float(c) for c in initial_guess])
+
+    threshold = tolerance * max(np.linalg.norm(b), 1e-300)
+    if method in (JACOBI, GAUSS_SEIDEL):
+        if preconditioner is not None:
+            raise ValueError('Smoothers do not take a preconditioner')
+        history = smooth(operator, b, x, method, threshold, max_iterations)
+    else:
+        apply_preconditioner = make_preconditioner(operator, preconditioner)
+        if method == CONJUGATE_GRADIENT:
+            history = conjugate_gradient(operator, b, x, apply_preconditioner,
+                                         threshold, max_iterations)
+        elif method == BICGSTAB:
+            history = bicgstab(operator, b, x, apply_preconditioner,
+                               threshold, max_iterations)
+        elif method == GMRES:
+            history = gmres(operator, b, x, apply_preconditioner,
+                            threshold, max_iterations, restart)
+        else:
+            raise ValueError('Unknown iterative method {!r}'.format(method))
+
+    residual_norm = np.linalg.norm(b - operator.matvec(x))
+    return IterativeResult(Vector(list(x)), bool(residual_norm <= threshold),
+                           len(history) - 1, residual_norm, history)
+
+
+def conjugate_gradient(operator, b, x, apply_preconditioner, threshold, max_iterations):
+    """Preconditioned CG for symmetric positive definite systems; updates x in place."""
+    r = b - operator.matvec(x)
+    z = apply_preconditioner(r)
+    p = z.copy()
+    rz = r.dot(z)
+    history = [np.linalg.norm(r)]
+    for _ in range(max_iterations):
+        if history[-1] <= threshold:
+            break
+        Ap = operator.matvec(p)
+        alpha = rz / p.dot(Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        history.append(np.linalg.norm(r))
+        z = apply_preconditioner(r)
+        rz, rz_old = r.dot(z), rz
+        p = z + (rz / rz_old) * p
+    return history
+
+
+def bicgstab(operator, b, x, apply_preconditioner, threshold, max_iterations):
+    """Right-preconditioned BiCGSTAB for general systems; updates x in place."""
+    r = b - operator.matvec(x)
+    r_hat = r.copy()
+    rho = alpha = omega = 1.0
+    v = np.zeros_like(x)
+    p = np.zeros_like(x)
+    history = [np.linalg.norm(r)]
+    for _ in range(max_iterations):
+        if history[-1] <= threshold:
+            break
+        rho, rho_old = r_hat.dot(r), rho
+        if rho == 0:
+            break
+        p = r + (rho / rho_old) * (alpha / omega) * (p - omega * v)
+        p_hat = apply_preconditioner(p)
+        v = operator.matvec(p_hat)
+        alpha = rho / r_hat.dot(v)
+        s = r - alpha * v
+        if np.linalg.norm(s) <= threshold:
+            x += alpha * p_hat
+            history.append(np.linalg.norm(s))
+            break
+        s_hat = apply_preconditioner(s)
+        t = operator.matvec(s_hat)
+        omega = t.dot(s) / t.dot(t)
+        x += alpha * p_hat + omega * s_hat
+        r = s - omega * t
+        history.append(np.linalg.norm(r))
+        if omega == 0:
+            break
+    return history
+
+
+def gmres(operator, b, x, apply_preconditioner, threshold, max_iterations, restart=30):
+    """Restarted, right-preconditioned GMRES; updates x in place."""
+    n = len(b)
+    restart = min(restart, n)
+    r = b - operator.matvec(x)
+    history = [np.linalg.norm(r)]
+    while len(history) <= max_iterations and history[-1] > threshold:
+        beta = history[-1]
+        basis = np.zeros((restart + 1, n))
+        hessenberg = np.zeros((restart + 1, restart))
+        cosines, sines = np.zeros(restart), np.zeros(restart)
+        g = np.zeros(restart + 1)
+        g[0] = beta
+        basis[0] = r / beta
+        preconditioned = []
+
+        k = 0
+        while k < restart and len(history) <= max_iterations:
+            z = apply_preconditioner(basis[k])
+            preconditioned.append(z)
+            w = operator.matvec(z)
+            for j in range(k + 1):
+                hessenberg[j, k] = w.dot(basis[j])
+                w -= hessenberg[j, k] * basis[j]
+            hessenberg[k+1, k] = np.linalg.norm(w)
+            if hessenberg[k+1, k] != 0:
+                basis[k+1] = w / hessenberg[k+1, k]
+
+            # Apply the previous rotations, then one that zeroes h[k+1, k].
+            for j in range(k):
+                h_j, h_next = hessenberg[j, k], hessenberg[j+1, k]
+                hessenberg[j, k] = cosines[j] * h_j + sines[j] * h_next
+                hessenberg[j+1, k] = -sines[j] * h_j + cosines[j] * h_next
+            denominator = sqrt(hessenberg[k, k] ** 2 + hessenberg[k+1, k] ** 2)
+            cosines[k] = hessenberg[k, k] / denominator
+            sines[k] = hessenberg[k+1, k] / denominator
+            hessenberg[k, k] = denominator
+            hessenberg[k+1, k] = 0
+            g[k+1] = -sines[k] * g[k]
+            g[k] = cosines[k] * g[k]
+
+            k += 1
+            history.append(abs(g[k]))
+            if history[-1] <= threshold:
+                break
+
+        y = np.zeros(k)
+        for i in range(k - 1, -1, -1):
+            y[i] = (g[i] - hessenberg[i, i+1:k].dot(y[i+1:])) / hessenberg[i, i]
+        x += np.dot(y, preconditioned[:k])
+        r = b - operator.matvec(x)
+        history[-1] = np.linalg.norm(r)
+    return history
+
+
+def nonzero_diagonal(operator):
+    """The diagonal of operator, checked before anything divides by it."""
+    diagonal = operator.diagonal()
+    if not np.all(diagonal != 0):
+        raise Exception(ZERO_DIAGONAL_MSG)
+    return diagonal
+
+
+def smooth(operator, b, x, method, threshold, max_iterations):
+    """Jacobi or Gauss-Seidel sweeps; updates x in place."""
+    inverse_diagonal = 1 / nonzero_diagonal(operator)
+    r = b - operator.matvec(x)
+    history = [np.linalg.norm(r)]
+    for _ in range(max_iterations):
+        if history[-1] <= threshold:
+            break
+        if method == JACOBI:
+            x += inverse_diagonal * r
+        else:
+            operator.gauss_seidel_sweep(x, b)
+        r = b - operator.matvec(x)
+        history.append(np.linalg.norm(r))
+    return history
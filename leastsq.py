@@ -0,0 +1,87 @@
+"""Least-squares solutions of overdetermined, possibly inconsistent systems.
+
+Equations are consumed in blocks of rows of the augmented matrix [A | b],
+so only an (n+1) x (n+1) summary is ever held in memory no matter how many
+equations are streamed through.
+"""
+import numpy as np
+
+from vector import Vector
+
+QR = 'qr'
+NORMAL_EQUATIONS = 'normal'
+
+
+class LeastSquaresResult(object):
+
+    def __init__(self, solution, residual_norm, num_equations):
+        self.solution = solution
+        self.residual_norm = residual_norm
+        self.num_equations = num_equations
+
+    def __str__(self):
+        return '{}, residual norm {:.6g} over {} equations'.format(
+            self.solution, self.residual_norm, self.num_equations)
+
+
+class LeastSquaresSolver(object):
+    """Accumulates blocks of equations and returns the best-fit solution.
+
+    The QR method keeps the triangular factor R of the augmented matrix,
+    updated by a Householder QR of [R; block] per block. The normal
+    equations method keeps A^T A, A^T b and b^T b instead; it is cheaper
+    per row but squares the condition number of the problem.
+    """
+
+    UNKNOWN_METHOD_MSG = 'Unknown least-squares method'
+    BLOCK_DIMENSION_MSG = 'Each block must have dimension + 1 columns'
+
+    def __init__(self, dimension, method=QR):
+        if method not in (QR, NORMAL_EQUATIONS):
+            raise Exception(self.UNKNOWN_METHOD_MSG)
+        self.dimension = dimension
+        self.method = method
+        self.num_equations = 0
+        if method == QR:
+            self.triangular = np.zeros((0, dimension + 1))
+        else:
+            self.gram = np.zeros((dimension + 1, dimension + 1))
+
+    def add_rows(self, block):
+        """Add a k x (dimension + 1) block of rows of [A | b]."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[1] != self.dimension + 1:
+            raise Exception(self.BLOCK_DIMENSION_MSG)
+        self.num_equations += block.shape[0]
+
+        if self.method == QR:
+            stacked = np.vstack([self.triangular, block])
+            self.triangular = np.linalg.qr(stacked, mode='r')
+        else:
+            self.gram += block.T.dot(block)
+
+    def result(self):
+        n = self.dimension
+        if self.method == QR:
+            triangular = np.zeros((n + 1, n + 1))
+            triangular[:len(self.triangular)] = self.triangular
+            solution = np.linalg.lstsq(triangular[:n, :n], triangular[:n, n], rcond=None)[0]
+            residual = triangular[:n, :n].dot(solution) - triangular[:n, n]
+            residual_norm = np.hypot(np.linalg.norm(residual), triangular[n, n])
+        else:
+            gram = self.gram[:n, :n]
+            moment = self.gram[:n, n]
+            solution = np.linalg.lstsq(gram, moment, rcond=None)[0]
+            squared = self.gram[n, n] - 2 * solution.dot(moment) + solution.dot(gram.dot(solution))
+            residual_norm = np.sqrt(max(squared, 0.0))
+
+        return LeastSquaresResult(Vector(list(solution)), float(residual_norm),
+                                  self.num_equations)
+
+
+def least_squares(blocks, dimension, method=QR):
+    """Best-fit solution of the equations in an iterable of [A | b] blocks."""
+    solver = LeastSquaresSolver(dimension, method)
+    for block in blocks:
+        solver.add_rows(block)
+    return solver.result()
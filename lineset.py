@@ -0,0 +1,92 @@
+import numpy as np
+
+from line import Line
+from vector import Vector, NUMPY
+
+
+class LineSet(object):
+    """A collection of 2-D lines n . x = k stored as arrays.
+
+    Intersections, parallelism and equality between every line of one set
+    and every line of another are computed in bulk, as N x M arrays.
+    """
+
+    def __init__(self, lines):
+        lines = list(lines)
+        self.normals = np.array([l.normal_vector.coordinates_for(NUMPY) for l in lines]).reshape(-1, 2)
+        self.constants = np.array([float(l.constant_term) for l in lines])
+
+    @classmethod
+    def from_arrays(cls, normals, constants):
+        line_set = cls([])
+        line_set.normals = np.array(normals, dtype=np.float64).reshape(-1, 2)
+        line_set.constants = np.array(constants, dtype=np.float64).reshape(-1)
+        return line_set
+
+    def unit_normals(self):
+        """Normalized normals and constants; zero normals stay zero."""
+        magnitude = np.hypot(self.normals[:, 0], self.normals[:, 1])
+        scale = np.where(magnitude > 0, 1 / np.where(magnitude > 0, magnitude, 1), 0)
+        return self.normals * scale[:, np.newaxis], self.constants * scale, magnitude == 0
+
+    def parallel_mask(self, other=None, tolerance=1e-10):
+        """N x M mask of parallel pairs.
+
+        As in Vector.isParallel, a zero normal is parallel to every line.
+        """
+        other = self if other is None else other
+        n1, _, zero1 = self.unit_normals()
+        n2, _, zero2 = other.unit_normals()
+        sines = np.outer(n1[:, 0], n2[:, 1]) - np.outer(n1[:, 1], n2[:, 0])
+        return (np.abs(sines) < tolerance) | zero1[:, np.newaxis] | zero2[np.newaxis, :]
+
+    def coincident_mask(self, other=None, tolerance=1e-10):
+        """N x M mask of pairs describing the same line, as Line.__eq__."""
+        other = self if other is None else other
+        n1, k1, zero1 = self.unit_normals()
+        n2, k2, zero2 = other.unit_normals()
+        parallel = self.parallel_mask(other, tolerance)
+
+        # Parallel unit normals are equal or opposite; flip the constant to match.
+        signs = np.sign(n1.dot(n2.T))
+        same_offset = np.abs(k1[:, np.newaxis] - signs * k2[np.newaxis, :]) < tolerance
+        coincident = parallel & same_offset & ~zero1[:, np.newaxis] & ~zero2[np.newaxis, :]
+
+        both_zero = zero1[:, np.newaxis] & zero2[np.newaxis, :]
+        equal_constants = np.abs(np.subtract.outer(self.constants, other.constants)) < tolerance
+        return coincident | (both_zero & equal_constants)
+
+    def intersections(self, other=None, tolerance=1e-10):
+        """
+        Pairwise intersections with the lines of other (default: self).
+
+        Returns an N x M x 2 array of intersection points, NaN for parallel
+        pairs, together with the parallel and coincident masks.
+        """
+        other = self if other is None else other
+        parallel = self.parallel_mask(other, tolerance)
+        coincident = self.coincident_mask(other, tolerance)
+
+        # Cramer's rule: x = (D*k1 - B*k2)/(AD - BC), y = (A*k2 - C*k1)/(AD - BC)
+        A, B = self.normals[:, 0, np.newaxis], self.normals[:, 1, np.newaxis]
+        C, D = other.normals[np.newaxis, :, 0], other.normals[np.newaxis, :, 1]
+        k1, k2 = self.constants[:, np.newaxis], other.constants[np.newaxis, :]
+        determinant = np.where(parallel, 1, A*D - B*C)
+        points = np.empty((len(self), len(other), 2))
+        points[:, :, 0] = (D*k1 - B*k2) / determinant
+        points[:, :, 1] = (A*k2 - C*k1) / determinant
+        points[parallel] = np.nan
+        return points, parallel, coincident
+
+    def __len__(self):
+        return len(self.constants)
+
+    def __getitem__(self, i):
+        return Line(Vector(self.normals[i]), self.constants[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __str__(self):
+        return 'LineSet: {} lines'.format(len(self))
@@ -1,7 +1,20 @@
 from decimal import Decimal, getcontext
-from copy import deepcopy
 
-from vector import Vector
+import exact
+import instrument
+import sparse
+
+try:
+    import numpy as np
+    import dense
+    import iterative
+    import leastsq
+    import lu
+    import modular
+except ImportError:
+    np = dense = iterative = leastsq = lu = modular = None
+
+from vector import Vector, NUMPY, FRACTION, is_near_zero, index_of_first_nonzero, to_scalar
 from plane import Plane
 from hyperplane import Hyperplane
 
@@ -13,6 +26,32 @@ class LinearSystem(object):
     ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG = 'All planes in the system should live in the same dimension'
     NO_SOLUTIONS_MSG = 'No solutions'
     INF_SOLUTIONS_MSG = 'Infinitely many solutions'
+    UNKNOWN_ENGINE_MSG = 'Unknown elimination engine'
+    UNKNOWN_PIVOTING_MSG = 'Unknown pivoting mode'
+    COMPLETE_PIVOTING_NEEDS_DENSE_ENGINE_MSG = ('Complete pivoting is only available for the '
+                                                'reduced row echelon form of the dense engine')
+
+    # Elimination engines: row operations on Plane objects, or in place
+    # on a single dense augmented matrix, either one pivot at a time or in
+    # blocked panels with partial pivoting. The exact engines eliminate
+    # over the rationals without rounding (pivoting does not apply), with
+    # fraction-free integer arithmetic or modulo many word-sized primes.
+    PLANES_ENGINE = 'planes'
+    DENSE_ENGINE = 'dense'
+    BLOCKED_ENGINE = 'blocked'
+    EXACT_ENGINE = 'exact'
+    MODULAR_ENGINE = 'modular'
+    MATRIX_ENGINES = (DENSE_ENGINE, BLOCKED_ENGINE)
+    RATIONAL_ENGINES = (EXACT_ENGINE, MODULAR_ENGINE)
+    # Solve with the system's cached LU factorization (see lu_factorization).
+    LU_ENGINE = 'lu'
+
+    # Pivot selection: None takes the first usable row, 'partial' the row
+    # with the largest leading coefficient, 'complete' the largest
+    # coefficient of the unreduced submatrix (RREF on the dense engine only).
+    NO_PIVOTING = None
+    PARTIAL_PIVOTING = 'partial'
+    COMPLETE_PIVOTING = 'complete'
 
     def __init__(self, planes):
         try:
@@ -25,16 +64,221 @@ class LinearSystem(object):
 
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
-            
-    def do_gaussian_elimination_and_parametrization(self):
-        rref = self.compute_rref()
-        rref.raise_excepion_if_contradictory_equation()
 
-        direction_vectors = rref.extract_direction_vectors_for_parametrization()  # NOQA
-        basepoint = rref.extract_basepoint_for_parametrization()
+    @property
+    def planes(self):
+        # Systems built with from_array only create their Plane objects
+        # the first time someone asks for them; the planes then take over
+        # as the storage of the system.
+        if self._planes is None:
+            self._planes = self.planes_from_matrix(self._matrix)
+            self._matrix = None
+        return self._planes
+
+    @planes.setter
+    def planes(self, planes):
+        self._planes = planes
+        self._matrix = None
+        self._factorization = None
+
+    @staticmethod
+    def planes_from_matrix(matrix, backend=None):
+        dimension = len(matrix[0]) - 1
+        planes = []
+        for row in matrix:
+            normal_vector = Vector(list(row[:-1]), backend)
+            if dimension == 3:
+                planes.append(Plane(normal_vector, row[-1]))
+            else:
+                planes.append(Hyperplane(normal_vector=normal_vector,
+                                         constant_term=row[-1]))
+        return planes
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Build a system from an augmented matrix, one equation per row."""
+        return cls(cls.planes_from_matrix(matrix))
+
+    @classmethod
+    def from_array(cls, matrix):
+        """
+        Build a system stored directly as an m x (n+1) augmented array.
+        No Plane objects are created unless the planes are accessed; the
+        array is used as is (it may be a numpy.memmap) and is not modified.
+        """
+        if matrix.ndim != 2 or matrix.shape[0] == 0 or matrix.shape[1] < 2:
+            raise Exception('The augmented matrix must be a nonempty m x (n+1) array')
+        system = cls.__new__(cls)
+        system._planes = None
+        system._matrix = matrix
+        system._factorization = None
+        system.dimension = matrix.shape[1] - 1
+        return system
+
+    def is_array_backed(self):
+        return self._matrix is not None
+
+    def to_matrix(self):
+        """Return the augmented matrix [A | b] of the system as a float array."""
+        if self._matrix is not None:
+            return np.array(self._matrix, dtype=np.float64)
+        matrix = np.empty((len(self), self.dimension + 1))
+        for i, p in enumerate(self.planes):
+            matrix[i, :-1] = p.normal_vector.coordinates_for(NUMPY)
+            matrix[i, -1] = p.constant_term
+        return matrix
+
+    def constant_terms(self):
+        """Return the constant terms of the equations as a float array."""
+        if self._matrix is not None:
+            return np.array(self._matrix[:, -1], dtype=np.float64)
+        return np.array([float(p.constant_term) for p in self.planes])
+
+    def to_rows(self):
+        """Return the augmented matrix as a list of rows, without rounding."""
+        if self._matrix is not None:
+            return self._matrix.tolist()
+        return [list(p.normal_vector) + [p.constant_term] for p in self.planes]
+
+    def iter_blocks(self, block_size=10000):
+        """Yield the augmented matrix block_size rows at a time."""
+        for start in range(0, len(self), block_size):
+            if self._matrix is not None:
+                yield np.asarray(self._matrix[start:start + block_size], dtype=np.float64)
+                continue
+            planes = self.planes[start:start + block_size]
+            block = np.empty((len(planes), self.dimension + 1))
+            for i, p in enumerate(planes):
+                block[i, :-1] = p.normal_vector.coordinates_for(NUMPY)
+                block[i, -1] = p.constant_term
+            yield block
+
+    def do_gaussian_elimination_and_parametrization(self, engine=PLANES_ENGINE,
+                                                    pivoting=NO_PIVOTING, workers=None,
+                                                    copy=True):
+        if engine in self.MATRIX_ENGINES:
+            return self.do_dense_elimination_and_parametrization(engine, pivoting, workers)
+        elif engine in self.RATIONAL_ENGINES:
+            return self.do_exact_elimination_and_parametrization(engine)
+        elif engine == self.LU_ENGINE:
+            solution = self.lu_factorization().solve(self.constant_terms())
+            if solution == self.NO_SOLUTIONS_MSG:
+                raise Exception(self.NO_SOLUTIONS_MSG)
+            return solution
+
+        rref = self.compute_rref(engine, pivoting, copy=copy)
+        with instrument.phase(instrument.PARAMETRIZATION):
+            rref.raise_excepion_if_contradictory_equation()
+
+            direction_vectors = rref.extract_direction_vectors_for_parametrization()  # NOQA
+            basepoint = rref.extract_basepoint_for_parametrization()
 
         return Parametrization(basepoint, direction_vectors)
 
+    def to_sparse(self):
+        """Return the system with its coefficients in sparse row storage."""
+        return sparse.SparseLinearSystem.from_linear_system(self)
+
+    def compute_iterative_solution(self, method='cg', tolerance=1e-10, max_iterations=None,
+                                   preconditioner=None, initial_guess=None):
+        """
+        Solve a square system with an iterative method instead of elimination.
+        # method: 'cg' (symmetric positive definite), 'gmres', 'bicgstab',
+        # 'jacobi' or 'gauss_seidel'
+        # preconditioner: None, 'jacobi' or a callable r -> z
+        Returns an IterativeResult whose solution is a Vector.
+        """
+        return iterative.solve(self, method, tolerance, max_iterations,
+                               preconditioner, initial_guess)
+
+    def compute_least_squares_solution(self, method='qr', block_size=10000):
+        """
+        Return the best-fit solution of an overdetermined system.
+        # method: 'qr' (Householder QR) or 'normal' (normal equations)
+        # the planes are converted block_size rows at a time
+        Returns a LeastSquaresResult with the solution Vector and residual norm.
+        """
+        return leastsq.least_squares(self.iter_blocks(block_size), self.dimension, method)
+
+    @instrument.timed(instrument.FACTORIZATION)
+    def lu_factorization(self):
+        """
+        Factor the coefficients once so they can be solved for many constants.
+        The factorization is cached until the equations of the system are
+        replaced (through __setitem__, the row operations or planes =);
+        changing a Plane object in place is not noticed.
+        """
+        if self._factorization is None:
+            self._factorization = lu.LUFactorization(self)
+        return self._factorization
+
+    def rank(self):
+        return self.lu_factorization().rank
+
+    def nullity(self):
+        """The number of free variables of a consistent system."""
+        return self.lu_factorization().nullity
+
+    def determinant(self):
+        return self.lu_factorization().determinant()
+
+    def inverse(self):
+        """The inverse of the coefficient matrix, as an n x n array."""
+        return self.lu_factorization().inverse()
+
+    def check_pivoting(self, engine, pivoting, reduced=True):
+        """Raise the same errors for a pivoting mode an engine cannot use, whatever the engine."""
+        if pivoting not in (self.NO_PIVOTING, self.PARTIAL_PIVOTING, self.COMPLETE_PIVOTING):
+            raise Exception(self.UNKNOWN_PIVOTING_MSG)
+        elif pivoting == self.COMPLETE_PIVOTING and (engine != self.DENSE_ENGINE or not reduced):
+            raise Exception(self.COMPLETE_PIVOTING_NEEDS_DENSE_ENGINE_MSG)
+
+    def reduce_matrix(self, matrix, engine, pivoting, reduced=True, workers=None):
+        """
+        Run a matrix engine in place on matrix; returns the pivot columns.
+        workers sets the number of threads for the blocked engine.
+        """
+        self.check_pivoting(engine, pivoting, reduced)
+        if engine == self.BLOCKED_ENGINE:
+            if reduced:
+                return dense.blocked_rref(matrix, workers=workers)
+            else:
+                return dense.blocked_triangular_form(matrix, workers=workers)
+        elif reduced:
+            return dense.rref(matrix, pivoting=pivoting)
+        else:
+            return dense.triangular_form(matrix, pivoting=pivoting)
+
+    def do_dense_elimination_and_parametrization(self, engine=DENSE_ENGINE,
+                                                 pivoting=NO_PIVOTING, workers=None):
+        matrix = self.to_matrix()
+        with instrument.phase(instrument.RREF):
+            pivots = self.reduce_matrix(matrix, engine, pivoting, workers=workers)
+        if dense.is_contradictory(matrix, pivots):
+            raise Exception(self.NO_SOLUTIONS_MSG)
+
+        with instrument.phase(instrument.PARAMETRIZATION):
+            basepoint, direction_vectors = dense.parametrization(matrix, pivots)
+        return Parametrization(Vector(list(basepoint)),
+                               [Vector(list(v)) for v in direction_vectors])
+
+    def exact_rref(self, engine=EXACT_ENGINE):
+        """RREF rows as Fractions and pivot columns from an exact engine."""
+        if engine == self.MODULAR_ENGINE:
+            return modular.rref(self.to_rows())
+        return exact.rref(self.to_rows())
+
+    def do_exact_elimination_and_parametrization(self, engine=EXACT_ENGINE):
+        with instrument.phase(instrument.RREF):
+            matrix, pivots = self.exact_rref(engine)
+        if exact.is_contradictory(matrix, pivots):
+            raise Exception(self.NO_SOLUTIONS_MSG)
+
+        with instrument.phase(instrument.PARAMETRIZATION):
+            basepoint, direction_vectors = exact.parametrization(matrix, pivots)
+        return Parametrization(Vector(basepoint, FRACTION),
+                               [Vector(v, FRACTION) for v in direction_vectors])
+
     def extract_direction_vectors_for_parametrization(self):
         num_variables = self.dimension
         pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
@@ -51,7 +295,7 @@ class LinearSystem(object):
                     break
                 vector_coords[pivot_var] = -plane.normal_vector[free_var]
 
-            direction_vectors.append(Vector(vector_coords))
+            direction_vectors.append(Vector(vector_coords, self.planes[0].normal_vector.backend))
 
         return direction_vectors
 
@@ -67,21 +311,17 @@ class LinearSystem(object):
                 break
             basepoint_coords[pivot_var] = plane.constant_term
 
-        return Vector(basepoint_coords)
+        return Vector(basepoint_coords, self.planes[0].normal_vector.backend)
 
     def raise_excepion_if_contradictory_equation(self):
-        for plane in self.planes:
-            try:
-                plane.first_nonzero_index(plane.normal_vector)
-
-            except Exception as e:
-                if str(e) == 'No nonzero elements found':
-                    constant_term = MyDecimal(plane.constant_term)
-                    if not constant_term.is_near_zero():
-                        raise Exception(self.NO_SOLUTIONS_MSG)
-
-                else:
-                    raise e
+        indices = self.indices_of_first_nonzero_terms_in_each_row()
+        if self.is_array_backed():
+            constant_terms = self._matrix[:, -1]
+        else:
+            constant_terms = [p.constant_term for p in self.planes]
+        for index, constant_term in zip(indices, constant_terms):
+            if index < 0 and not is_near_zero(constant_term):
+                raise Exception(self.NO_SOLUTIONS_MSG)
 
     def raise_excepion_if_too_few_pivots(self):
         pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
@@ -91,16 +331,27 @@ class LinearSystem(object):
         if num_pivots < num_variables:
             raise Exception(self.INF_SOLUTIONS_MSG)
 
-    def compute_solution(self):
+    def compute_solution(self, engine=PLANES_ENGINE, pivoting=NO_PIVOTING, workers=None,
+                         copy=True, cache=None):
         """
         Return the solutions of the System
+        # engine selects PLANES_ENGINE (default), DENSE_ENGINE, BLOCKED_ENGINE
+        # EXACT_ENGINE, MODULAR_ENGINE or LU_ENGINE
+        # pivoting selects NO_PIVOTING (default), PARTIAL_ or COMPLETE_PIVOTING
+        # workers > 1 runs the BLOCKED_ENGINE updates on that many threads
+        # copy=False lets the PLANES_ENGINE reduce the system's own planes
+        # cache, a cache.SolveCache, answers systems equal to ones solved before
+        # (not with copy=False)
         # if there is 0 = k there are no solutions
         # if there are less planes than dimensions there are infinite solutions
         # if there are more than 1 pivot variable there are infinite solutions
         # otherwise there is a single solution
         """
+        if cache is not None:
+            return cache.compute_solution(self, engine, pivoting, workers=workers, copy=copy)
         try:
-            return self.do_gaussian_elimination_and_parametrization()
+            return self.do_gaussian_elimination_and_parametrization(engine, pivoting, workers,
+                                                                    copy)
 
         except Exception as e:
             if (str(e) == self.NO_SOLUTIONS_MSG):
@@ -127,75 +378,208 @@ class LinearSystem(object):
 #            print ("The solution is : ")
 #            print (rref)
         
-    def compute_rref(self):
-        tf = self.compute_triangular_form()
-        num_equations =len(tf)
-        try:
-            tf[num_equations-1].normal_vector[num_equations-1]
-        except IndexError:
-            num_equations -= 1
-        for num_row in range(num_equations-1,-1, -1):
-            leading_row_is_zero = MyDecimal(tf[num_row].normal_vector[num_row]).is_near_zero()
-            if tf[num_row].normal_vector[num_row] != 1 and not leading_row_is_zero:
-                    tf[num_row] *= Decimal(1)/tf[num_row].normal_vector[num_row]
-            # Loop that eliminates nonzeroes below current row.
+    @instrument.timed(instrument.RREF)
+    def compute_rref(self, engine=PLANES_ENGINE, pivoting=NO_PIVOTING, workers=None,
+                     copy=True):
+        """
+        The system in reduced row echelon form. With copy=False the planes
+        engine changes this system's Plane objects in place and returns
+        the system itself; the other engines always build a new system.
+        """
+        if engine in self.MATRIX_ENGINES:
+            matrix = self.to_matrix()
+            self.reduce_matrix(matrix, engine, pivoting, workers=workers)
+            return self.from_array(matrix)
+        elif engine in self.RATIONAL_ENGINES:
+            matrix, _ = self.exact_rref(engine)
+            return LinearSystem(self.planes_from_matrix(matrix, FRACTION))
+        elif engine != self.PLANES_ENGINE:
+            raise Exception(self.UNKNOWN_ENGINE_MSG)
+
+        planes, rows = self.equation_rows()
+        with instrument.phase(instrument.TRIANGULAR):
+            pivots = self.triangular_rows(planes, rows, pivoting)
+        stats = instrument.active
+        backend = self.backend()
+        zero = to_scalar(0, backend)
+        for num_row in range(len(pivots) - 1, -1, -1):
+            tf_row, col = rows[num_row], pivots[num_row]
+            if stats is not None:
+                stats.count(instrument.PIVOTS_TESTED)
+            if tf_row[col] != 1:
+                scale_row(tf_row, to_scalar(1/tf_row[col], backend))
+                if stats is not None:
+                    stats.count(instrument.ROW_OPS)
+            # Loop that eliminates nonzeroes above the pivot.
             for index in range(num_row-1, -1,-1):
-                bottom_rows_check = MyDecimal(tf[index].normal_vector[num_row]).is_near_zero()
-                if not bottom_rows_check and not leading_row_is_zero:
-                    # /tf[num_row].normal_vector[num_row]
-                    coeff = tf[index].normal_vector[num_row]
-                    tf.add_multiple_times_row_to_row(-coeff, num_row, index)
-        return tf
-    
-    def compute_triangular_form(self):
-        triform = deepcopy(self)
-        num_equations = len(triform)
-        for num_row in range(num_equations):
-            # Loop that swaps rows for leading coeffcients if possible.
-            for index in range(num_row + 1, num_equations):
-                if triform[num_row].normal_vector[num_row] == 0 and triform[index].normal_vector[num_row] != 0:
-                    triform.swap_rows(index-1, index)
-                    break
+                bottom_rows_check = is_near_zero(rows[index][col])
+                if stats is not None:
+                    stats.count(instrument.ZERO_TESTS)
+                if not bottom_rows_check:
+                    coeff = rows[index][col]
+                    add_multiple_of_row(to_scalar(-coeff, backend), tf_row, rows[index])
+                    if stats is not None:
+                        stats.count(instrument.ROW_OPS)
+                rows[index][col] = zero
+        return self.system_from_rows(planes, rows, copy)
+
+    @instrument.timed(instrument.TRIANGULAR)
+    def compute_triangular_form(self, engine=PLANES_ENGINE, pivoting=NO_PIVOTING, workers=None,
+                                copy=True):
+        """
+        The system in row echelon form. copy=False works in place as in
+        compute_rref.
+        """
+        if engine in self.MATRIX_ENGINES:
+            matrix = self.to_matrix()
+            self.reduce_matrix(matrix, engine, pivoting, reduced=False, workers=workers)
+            return self.from_array(matrix)
+        elif engine == self.EXACT_ENGINE:
+            matrix, _ = exact.triangular_form(self.to_rows())
+            return LinearSystem(self.planes_from_matrix(matrix, FRACTION))
+        elif engine == self.MODULAR_ENGINE:
+            # The RREF is the only form the modular engine can reconstruct.
+            matrix, _ = modular.rref(self.to_rows())
+            return LinearSystem(self.planes_from_matrix(matrix, FRACTION))
+        elif engine != self.PLANES_ENGINE:
+            raise Exception(self.UNKNOWN_ENGINE_MSG)
+
+        planes, rows = self.equation_rows()
+        self.triangular_rows(planes, rows, pivoting)
+        return self.system_from_rows(planes, rows, copy)
+
+    def backend(self):
+        return self.planes[0].normal_vector.backend
+
+    def equation_rows(self):
+        """
+        The planes of the system as a new list, and each equation as one
+        mutable row [a_1, ..., a_n, k] (a float array for the numpy
+        backend) that the planes engine can reduce in place.
+        """
+        planes = list(self.planes)
+        backend = self.backend()
+        if backend == NUMPY:
+            rows = [np.append(p.normal_vector.coordinates, float(p.constant_term)) for p in planes]
+        else:
+            rows = [list(p.normal_vector.coordinates) + [p.constant_term] for p in planes]
+        if instrument.active is not None:
+            instrument.active.count(instrument.ALLOCATIONS, len(rows))
+        return planes, rows
+
+    def system_from_rows(self, planes, rows, copy=True):
+        """
+        The system whose equations are the rows, made from new planes or,
+        with copy=False, by changing the given planes in place and making
+        them the planes of this system.
+        """
+        backend = self.backend()
+        for i, (plane, row) in enumerate(zip(planes, rows)):
+            normal_vector = Vector(row[:-1], backend)
+            if copy:
+                planes[i] = type(plane)(normal_vector=normal_vector, constant_term=row[-1])
+            else:
+                plane.set_equation(normal_vector, row[-1])
+        if instrument.active is not None:
+            # One Vector per row, and a plane unless the old one is reused.
+            instrument.active.count(instrument.ALLOCATIONS, len(rows) * (2 if copy else 1))
+        if copy:
+            return LinearSystem(planes)
+        self.planes = planes
+        return self
+
+    def triangular_rows(self, planes, rows, pivoting):
+        """
+        The planes engine elimination, in place on equation_rows; planes
+        follow the swaps. Returns the pivot column of each nonzero row, top
+        to bottom: a column without a pivot does not use up a row.
+        """
+        self.check_pivoting(self.PLANES_ENGINE, pivoting)
+
+        def swap(i, j):
+            rows[i], rows[j] = rows[j], rows[i]
+            planes[i], planes[j] = planes[j], planes[i]
+            if stats is not None:
+                stats.count(instrument.ROW_SWAPS)
+
+        stats = instrument.active
+        backend = self.backend()
+        zero = to_scalar(0, backend)
+        num_equations = len(rows)
+        pivots = []
+        num_row = 0
+        for col in range(self.dimension):
+            if num_row == num_equations:
+                break
+            if pivoting == self.PARTIAL_PIVOTING:
+                # The row with the largest coefficient in this column.
+                pivot_row = max(range(num_row, num_equations), key=lambda i: abs(rows[i][col]))
+                if stats is not None:
+                    stats.count(instrument.PIVOTS_TESTED, num_equations - num_row)
+                if is_near_zero(rows[pivot_row][col]):
+                    continue
+            else:
+                # The first row with a coefficient in this column.
+                pivot_row = None
+                for index in range(num_row, num_equations):
+                    if stats is not None:
+                        stats.count(instrument.PIVOTS_TESTED)
+                    if not is_near_zero(rows[index][col]):
+                        pivot_row = index
+                        break
+                if pivot_row is None:
+                    continue
+            if pivot_row != num_row:
+                swap(num_row, pivot_row)
             # Loop that eliminates nonzeroes below current row.
             for index in range(num_row + 1, num_equations):
-                bottom_rows_check = MyDecimal(triform[index].normal_vector[num_row]).is_near_zero()
+                bottom_rows_check = is_near_zero(rows[index][col])
+                if stats is not None:
+                    stats.count(instrument.ZERO_TESTS)
                 if not  bottom_rows_check:
-                    coeff = triform[index].normal_vector[num_row]/triform[num_row].normal_vector[num_row]
-                    triform.add_multiple_times_row_to_row(-coeff, num_row, index)
-        return triform
+                    coeff = rows[index][col]/rows[num_row][col]
+                    add_multiple_of_row(to_scalar(-coeff, backend), rows[num_row], rows[index])
+                    if stats is not None:
+                        stats.count(instrument.ROW_OPS)
+                rows[index][col] = zero
+            pivots.append(col)
+            num_row += 1
+        return pivots
 
     def swap_rows(self, row1, row2):
+        if instrument.active is not None:
+            instrument.active.count(instrument.ROW_SWAPS)
         self[row1], self[row2] = self[row2], self[row1]
 
 
     def multiply_coefficient_and_row(self, coefficient, row):
         #redundant but added to pass course test cases
+        if instrument.active is not None:
+            instrument.active.count(instrument.ROW_OPS)
+            # A new plane and its normal vector.
+            instrument.active.count(instrument.ALLOCATIONS, 2)
         self[row] *= coefficient
 
 
     def add_multiple_times_row_to_row(self, coefficient, row_to_add, row_to_be_added_to):
+        if instrument.active is not None:
+            instrument.active.count(instrument.ROW_OPS)
+            # Two planes and their normal vectors: the multiple and the sum.
+            instrument.active.count(instrument.ALLOCATIONS, 4)
         plane_add, plane_added = self[row_to_add], self[row_to_be_added_to]
         self[row_to_be_added_to] = plane_add * coefficient + plane_added
 
     def indices_of_first_nonzero_terms_in_each_row(self):
-        num_equations = len(self)
-        num_variables = self.dimension
-
-        indices = [-1] * num_equations
-
-        for i,p in enumerate(self.planes):
-            try:
-                indices[i] = p.first_nonzero_index(p.normal_vector)
-            except Exception as e:
-                if str(e) == Plane.NO_NONZERO_ELTS_FOUND_MSG:
-                    continue
-                else:
-                    raise e
-
-        return indices
+        """The pivot column of each row, -1 for rows without one."""
+        if self.is_array_backed():
+            # One pass over the whole array, without creating any planes.
+            return dense.indices_of_first_nonzero(self._matrix[:, :-1]).tolist()
+        return [index_of_first_nonzero(p.normal_vector.coordinates) for p in self.planes]
 
 
     def __len__(self):
+        if self._planes is None:
+            return len(self._matrix)
         return len(self.planes)
 
 
@@ -207,6 +591,7 @@ class LinearSystem(object):
         try:
             assert x.dimension == self.dimension
             self.planes[i] = x
+            self._factorization = None
 
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
@@ -219,6 +604,22 @@ class LinearSystem(object):
         return ret
 
 
+def scale_row(row, coefficient):
+    """Multiply an equation row by a scalar in place."""
+    if isinstance(row, list):
+        row[:] = [x*coefficient for x in row]
+    else:
+        row *= coefficient
+
+
+def add_multiple_of_row(coefficient, row_to_add, row_to_be_added_to):
+    """Add coefficient times one equation row to another, in place."""
+    if isinstance(row_to_be_added_to, list):
+        row_to_be_added_to[:] = [x*coefficient + y for x, y in zip(row_to_add, row_to_be_added_to)]
+    else:
+        row_to_be_added_to += row_to_add * coefficient
+
+
 class MyDecimal(Decimal):
     def is_near_zero(self, eps=1e-10):
         return abs(self) < eps
@@ -0,0 +1,72 @@
+"""Build LinearSystems straight into array storage.
+
+Every loader reads rows of the augmented matrix [A | b] (coefficients
+followed by the constant term) without creating a Plane per equation.
+The iter_*_blocks functions yield the rows in fixed-size blocks for
+systems that should not be held in memory at once; they can be fed to
+leastsq.least_squares or from_blocks.
+"""
+import csv
+from itertools import islice
+
+import numpy as np
+
+from linsys import LinearSystem
+
+BLOCK_SIZE = 10000
+
+NO_EQUATIONS_MSG = 'There are no equations to load'
+
+
+def from_blocks(blocks):
+    """Concatenate [A | b] blocks into one array-backed LinearSystem."""
+    blocks = [np.asarray(block, dtype=np.float64) for block in blocks]
+    if not blocks:
+        raise Exception(NO_EQUATIONS_MSG)
+    return LinearSystem.from_array(np.vstack(blocks))
+
+
+def iter_row_blocks(rows, block_size=BLOCK_SIZE):
+    """Group an iterable of [A | b] rows into blocks of block_size rows."""
+    rows = iter(rows)
+    while True:
+        block = list(islice(rows, block_size))
+        if not block:
+            return
+        yield np.array(block, dtype=np.float64)
+
+
+def from_rows(rows, block_size=BLOCK_SIZE):
+    """Build a system from an iterable (e.g. a generator) of [A | b] rows."""
+    return from_blocks(iter_row_blocks(rows, block_size))
+
+
+def iter_csv_blocks(path, block_size=BLOCK_SIZE, delimiter=',', skip_header=0):
+    """Yield the rows of a CSV file of [A | b] rows in blocks."""
+    with open(path, newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        for _ in range(skip_header):
+            next(reader, None)
+        rows = (row for row in reader if row)
+        for block in iter_row_blocks(rows, block_size):
+            yield block
+
+
+def load_csv(path, delimiter=',', skip_header=0, block_size=BLOCK_SIZE):
+    return from_blocks(iter_csv_blocks(path, block_size, delimiter, skip_header))
+
+
+def iter_npy_blocks(path, block_size=BLOCK_SIZE):
+    """Yield the rows of a 2-D .npy file in blocks, paging them in from disk."""
+    matrix = np.load(path, mmap_mode='r')
+    for start in range(0, len(matrix), block_size):
+        yield np.array(matrix[start:start + block_size], dtype=np.float64)
+
+
+def load_npy(path, mmap=False):
+    """
+    Load a 2-D .npy file of [A | b] rows. With mmap=True the system is
+    backed by a read-only memory map and rows are only read when used.
+    """
+    matrix = np.load(path, mmap_mode='r' if mmap else None)
+    return LinearSystem.from_array(matrix)
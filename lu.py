@@ -0,0 +1,152 @@
+import numpy as np
+
+import linsys
+from vector import Vector
+
+TOLERANCE = 1e-10
+
+
+class LUFactorization(object):
+    """PA = LU factorization of the coefficients of a LinearSystem.
+
+    The factorization is computed once with partial pivoting and can then
+    solve the system for any number of constant-term vectors by forward and
+    back substitution. Rank deficient and non-square systems are supported:
+    U is kept in row echelon form together with its pivot columns.
+    """
+
+    ALL_CONSTANTS_MUST_MATCH_EQUATIONS_MSG = 'There must be one constant term per equation'
+    NOT_SQUARE_MSG = 'The system must have as many equations as variables'
+    SINGULAR_MSG = 'The coefficient matrix is singular'
+
+    def __init__(self, system, tolerance=TOLERANCE):
+        if isinstance(system, linsys.LinearSystem):
+            coefficients = system.to_matrix()[:, :-1]
+        else:
+            coefficients = np.array(system, dtype=np.float64)
+
+        self.tolerance = tolerance
+        self.num_equations, self.dimension = coefficients.shape
+        self.permutation, self.lower, self.upper, self.pivots = self.factorize(
+            coefficients, tolerance)
+        self.rank = len(self.pivots)
+        self.nullity = self.dimension - self.rank
+        self.direction_vectors = self.compute_direction_vectors()
+
+    @staticmethod
+    def factorize(coefficients, tolerance=TOLERANCE):
+        num_equations, num_variables = coefficients.shape
+        permutation = np.arange(num_equations)
+        lower = np.zeros((num_equations, min(num_equations, num_variables)))
+        pivots = []
+        row = 0
+        for col in range(num_variables):
+            if row == num_equations:
+                break
+            column = np.abs(coefficients[row:, col])
+            best = np.argmax(column)
+            if column[best] <= tolerance:
+                continue
+            pivot_row = row + best
+            if pivot_row != row:
+                coefficients[[row, pivot_row]] = coefficients[[pivot_row, row]]
+                lower[[row, pivot_row]] = lower[[pivot_row, row]]
+                permutation[[row, pivot_row]] = permutation[[pivot_row, row]]
+
+            factors = coefficients[row+1:, col] / coefficients[row, col]
+            lower[row+1:, row] = factors
+            coefficients[row+1:, col:] -= np.outer(factors, coefficients[row, col:])
+            coefficients[row+1:, col] = 0
+            pivots.append(col)
+            row += 1
+
+        return permutation, lower[:, :row], coefficients[:row], pivots
+
+    def compute_direction_vectors(self):
+        free_variables = sorted(set(range(self.dimension)) - set(self.pivots))
+        direction_vectors = []
+        for free_var in free_variables:
+            direction = np.zeros(self.dimension)
+            direction[free_var] = 1
+            direction[self.pivots] = -self.back_substitute(self.upper[:, [free_var]])[:, 0]
+            direction_vectors.append(direction)
+        return direction_vectors
+
+    def determinant(self):
+        """det(A) = det(P) * prod(diag(U)) for a square coefficient matrix."""
+        if self.num_equations != self.dimension:
+            raise Exception(self.NOT_SQUARE_MSG)
+        if self.rank < self.dimension:
+            return 0.0
+
+        # A permutation with c cycles is a product of n - c transpositions.
+        seen = np.zeros(self.dimension, dtype=bool)
+        cycles = 0
+        for start in range(self.dimension):
+            if not seen[start]:
+                cycles += 1
+                i = start
+                while not seen[i]:
+                    seen[i] = True
+                    i = self.permutation[i]
+        sign = -1.0 if (self.dimension - cycles) % 2 else 1.0
+        return sign * float(np.prod(np.diag(self.upper)))
+
+    def inverse(self):
+        """The inverse of a square regular coefficient matrix as an n x n array."""
+        if self.num_equations != self.dimension:
+            raise Exception(self.NOT_SQUARE_MSG)
+        if self.rank < self.dimension:
+            raise Exception(self.SINGULAR_MSG)
+        columns, _ = self.solve_array(np.eye(self.dimension))
+        return columns.T
+
+    def back_substitute(self, y):
+        """Solve U[:, pivots] x = y for a rank x k block of right-hand sides."""
+        x = np.array(y, dtype=np.float64)
+        for row in range(self.rank - 1, -1, -1):
+            later = self.pivots[row+1:]
+            x[row] -= self.upper[row, later].dot(x[row+1:])
+            x[row] /= self.upper[row, self.pivots[row]]
+        return x
+
+    def solve_array(self, constant_terms):
+        """Solve for each column of an m x k array of constant terms.
+
+        Returns a k x n array of basepoints (free variables set to zero) and
+        a boolean array telling which right-hand sides are consistent.
+        """
+        constant_terms = np.asarray(constant_terms, dtype=np.float64)
+        if constant_terms.shape[0] != self.num_equations:
+            raise Exception(self.ALL_CONSTANTS_MUST_MATCH_EQUATIONS_MSG)
+
+        y = constant_terms[self.permutation]
+        for j in range(self.rank):
+            y[j+1:] -= np.outer(self.lower[j+1:, j], y[j])
+
+        consistent = np.all(np.abs(y[self.rank:]) <= self.tolerance, axis=0)
+        basepoints = np.zeros((self.dimension, y.shape[1]))
+        basepoints[self.pivots] = self.back_substitute(y[:self.rank])
+        return basepoints.T, consistent
+
+    def solve(self, constant_terms):
+        """Solve for one constant-term vector.
+
+        Returns a Parametrization, or LinearSystem.NO_SOLUTIONS_MSG, just
+        like LinearSystem.compute_solution.
+        """
+        constant_terms = np.array([float(c) for c in constant_terms])
+        return self.solve_many(constant_terms[:, np.newaxis])[0]
+
+    def solve_many(self, constant_terms):
+        """Solve for every column of an m x k array of constant terms."""
+        basepoints, consistent = self.solve_array(constant_terms)
+        direction_vectors = [Vector(list(v)) for v in self.direction_vectors]
+        solutions = []
+        for basepoint, is_consistent in zip(basepoints, consistent):
+            if is_consistent:
+                solutions.append(linsys.Parametrization(Vector(list(basepoint)),
+                                                        direction_vectors))
+            else:
+                solutions.append(linsys.LinearSystem.NO_SOLUTIONS_MSG)
+        return solutions
@@ -0,0 +1,296 @@
+"""Exact elimination of rational systems through modular arithmetic.
+
+The augmented matrix is scaled to integers and reduced to RREF modulo a
+sequence of primes just below 2**31, so every product of two residues
+fits in an int64 and each reduction is a handful of numpy operations per
+pivot. The residues of the RREF are combined by the Chinese remainder
+theorem and turned back into fractions by rational reconstruction; the
+result is then checked exactly against the original system, so it never
+depends on a tolerance or on how many primes happened to be used.
+"""
+from fractions import Fraction
+from math import gcd, isqrt
+
+import numpy as np
+
+import exact
+
+MAX_PRIME = 2 ** 31
+MAX_PRIMES = 1000
+BATCH_SIZE = 8
+
+
+class ModularReconstructionError(Exception):
+    pass
+
+
+def is_prime(n):
+    """Deterministic Miller-Rabin for n < 3.4e14."""
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7, 11, 13, 17):
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in (2, 3, 5, 7, 11, 13, 17):
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def primes(start=MAX_PRIME):
+    """The primes below start, largest first."""
+    n = start - 1
+    while n > 2:
+        if is_prime(n):
+            yield n
+        n -= 2 if n % 2 else 1
+
+
+def prime_batches(batch_size=BATCH_SIZE):
+    """The primes below MAX_PRIME, largest first, as int64 arrays of batch_size."""
+    batch = []
+    for prime in primes():
+        batch.append(prime)
+        if len(batch) == batch_size:
+            yield np.array(batch, dtype=np.int64)
+            batch = []
+
+
+def residues(rows, moduli):
+    """K x m x w residues of an integer matrix modulo each of K moduli."""
+    matrix = np.array(rows, dtype=object)
+    return np.stack([(matrix % int(p)).astype(np.int64) for p in moduli])
+
+
+def rref_mod(matrices, moduli):
+    """
+    Gauss-Jordan elimination in place on a K x m x w stack of residues,
+    matrix k modulo moduli[k], all K at once. Returns the pivot columns
+    of every matrix and the determinants of their pivot blocks.
+    """
+    num_matrices, num_rows, width = matrices.shape
+    everything = np.arange(num_matrices)
+    rows = np.arange(num_rows)
+    current = np.zeros(num_matrices, dtype=np.intp)
+    determinants = [1] * num_matrices
+    pivot_columns = np.full((num_matrices, num_rows), -1)
+
+    for col in range(width):
+        # Rows at or past the current one are zero left of col.
+        candidates = (matrices[:, :, col] != 0) & (rows[np.newaxis, :] >= current[:, np.newaxis])
+        has_pivot = candidates.any(axis=1)
+        if not has_pivot.any():
+            continue
+        which = everything[has_pivot]
+        pivot_rows = np.argmax(candidates[which], axis=1)
+        target_rows = current[which]
+
+        pivot = matrices[which, pivot_rows, col:]
+        matrices[which, pivot_rows, col:] = matrices[which, target_rows, col:]
+        inverses = np.empty(len(which), dtype=np.int64)
+        for k, (index, value) in enumerate(zip(which.tolist(), pivot[:, 0].tolist())):
+            prime = int(moduli[index])
+            sign = -1 if pivot_rows[k] != target_rows[k] else 1
+            determinants[index] = sign * determinants[index] * value % prime
+            inverses[k] = pow(value, -1, prime)
+        pivot_moduli = moduli[which, np.newaxis]
+        pivot = pivot * inverses[:, np.newaxis] % pivot_moduli
+        matrices[which, target_rows, col:] = pivot
+
+        factors = matrices[which, :, col]
+        factors[np.arange(len(which)), target_rows] = 0
+        update = factors[:, :, np.newaxis] * pivot[:, np.newaxis, :]
+        if len(which) == num_matrices:
+            # The usual case: every matrix has a pivot, so work on views.
+            block = matrices[:, :, col:]
+            np.subtract(block, update, out=block)
+            np.remainder(block, pivot_moduli[:, :, np.newaxis], out=block)
+        else:
+            matrices[which, :, col:] = ((matrices[which, :, col:] - update) %
+                                        pivot_moduli[:, :, np.newaxis])
+        pivot_columns[which, target_rows] = col
+        current[which] += 1
+
+    pivots = [[int(c) for c in columns if c >= 0] for columns in pivot_columns]
+    return pivots, determinants
+
+
+def rational_reconstruction(residue, modulus):
+    """The fraction a/b = residue (mod modulus) with |a|, b <= sqrt(modulus/2), or None."""
+    bound = isqrt(modulus // 2)
+    r0, r1 = modulus, residue % modulus
+    s0, s1 = 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        s0, s1 = s1, s0 - q * s1
+    if s1 == 0 or abs(s1) > bound:
+        return None
+    return Fraction(r1, s1)
+
+
+def reconstruct(values, modulus):
+    """
+    Fractions for an array of residues sharing modulus, or None. The
+    denominators found so far are tried first: entries of an RREF share
+    most of their denominator, so most need no reconstruction of their own.
+    """
+    bound = isqrt(modulus // 2)
+    denominator = 1
+    fractions = []
+    for value in values:
+        numerator = int(value) * denominator % modulus
+        if numerator > modulus // 2:
+            numerator -= modulus
+        if abs(numerator) <= bound:
+            fractions.append(Fraction(numerator, denominator))
+            continue
+        fraction = rational_reconstruction(numerator, modulus)
+        if fraction is None:
+            return None
+        denominator *= fraction.denominator
+        fractions.append(fraction / (denominator // fraction.denominator))
+    return fractions
+
+
+def crt(values, modulus, new_values, prime):
+    """Combine residues mod modulus with residues mod prime (object arrays)."""
+    inverse = pow(modulus % prime, -1, prime)
+    current = (values % prime).astype(np.int64)
+    step = (new_values - current) % prime * inverse % prime
+    return values + modulus * step.astype(object), modulus * prime
+
+
+def verify(rows, solution, pivots):
+    """
+    Check an RREF found modulo primes against the integer rows: every
+    direction vector must solve the homogeneous system, and the
+    basepoint the system itself unless it was found inconsistent.
+    """
+    matrix, coefficient_pivots = solution
+    num_variables = len(rows[0]) - 1
+    basepoint, direction_vectors = exact.parametrization(matrix, coefficient_pivots)
+    vectors = list(direction_vectors)
+    consistent = len(pivots) == len(coefficient_pivots)
+    if consistent:
+        vectors.append(basepoint)
+
+    for k, vector in enumerate(vectors):
+        is_basepoint = consistent and k == len(vectors) - 1
+        denominator = 1
+        for a in vector:
+            denominator = denominator * a.denominator // gcd(denominator, a.denominator)
+        numerators = [int(a * denominator) for a in vector]
+        for row in rows:
+            total = sum(a * x for a, x in zip(row[:num_variables], numerators) if a and x)
+            if total != (row[-1] * denominator if is_basepoint else 0):
+                return False
+    return True
+
+
+def rref(matrix, max_primes=MAX_PRIMES):
+    """
+    Exact RREF of an augmented matrix of numbers convertible to Fraction,
+    in the same form as exact.rref: the rows as Fractions and the pivot
+    columns. If the system is inconsistent, the row with a pivot in the
+    constant column reads 0 = 1 and the constant terms above it are 0.
+    """
+    rows, _ = exact.integer_rows(matrix)
+    num_variables = len(rows[0]) - 1
+    width = num_variables + 1
+
+    best_pivots = None
+    values = modulus = None
+    used = 0
+    attempt_at = 1
+    for batch in prime_batches():
+        if used >= max_primes:
+            break
+        reduced = residues(rows, batch)
+        pivot_lists, _ = rref_mod(reduced, batch)
+        for prime, matrix, pivots in zip(batch, reduced, pivot_lists):
+            # An unlucky prime divides some minor, so it can only lose
+            # pivots or move them right: keep the best pivots seen.
+            key = (-len(pivots), pivots)
+            if best_pivots is None or key < (-len(best_pivots), best_pivots):
+                best_pivots, values, modulus, used, attempt_at = pivots, None, None, 0, 1
+                free_columns = [c for c in range(width) if c not in pivots]
+            elif pivots != best_pivots:
+                continue
+
+            # Pivot columns of an RREF are known; only the rest are recovered.
+            entries = matrix[:len(best_pivots)][:, free_columns].astype(object)
+            if values is None:
+                values, modulus = entries, int(prime)
+            else:
+                values, modulus = crt(values, modulus, entries, int(prime))
+            used += 1
+
+        if used < attempt_at:
+            continue
+        attempt_at *= 2
+        fractions = reconstruct(values.reshape(-1), modulus)
+        if fractions is None:
+            continue
+
+        result = [[Fraction(0)] * width for _ in rows]
+        for i, col in enumerate(best_pivots):
+            result[i][col] = Fraction(1)
+            for j, free in enumerate(free_columns):
+                result[i][free] = fractions[i * len(free_columns) + j]
+        coefficient_pivots = [p for p in best_pivots if p < num_variables]
+        if verify(rows, (result, coefficient_pivots), best_pivots):
+            return result, coefficient_pivots
+
+    raise ModularReconstructionError(
+        'Could not reconstruct the RREF from {} primes'.format(used))
+
+
+def rank(matrix):
+    """Exact rank of a coefficient matrix (no constant column)."""
+    _, pivots = rref([list(row) + [0] for row in matrix])
+    return len(pivots)
+
+
+def hadamard_bound(rows):
+    """An upper bound on the absolute value of any minor of an integer matrix."""
+    bound = 1
+    for row in rows:
+        bound *= isqrt(sum(a * a for a in row)) + 1
+    return bound
+
+
+def determinant(matrix):
+    """
+    Exact determinant of a square matrix (no constant column), from
+    enough primes that their product exceeds twice the Hadamard bound.
+    """
+    rows, denominators = exact.integer_rows(matrix)
+    bound = hadamard_bound(rows)
+    value, modulus = 0, 1
+    for batch in prime_batches():
+        if modulus > 2 * bound:
+            break
+        pivot_lists, determinants = rref_mod(residues(rows, batch), batch)
+        for prime, pivots, det in zip(batch.tolist(), pivot_lists, determinants):
+            if len(pivots) < len(rows):
+                det = 0
+            value = value + modulus * ((det - value) * pow(modulus, -1, prime) % prime)
+            modulus *= prime
+    if value > modulus // 2:
+        value -= modulus
+
+    result = Fraction(value)
+    for denominator in denominators:
+        result /= denominator
+    return result
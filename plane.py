@@ -1,6 +1,6 @@
 from decimal import Decimal, getcontext
 
-from vector import Vector
+from vector import Vector, to_scalar, is_near_zero, index_of_first_nonzero
 
 import numbers
 
@@ -9,6 +9,8 @@ getcontext().prec = 30
 
 class Plane(object):
 
+    __slots__ = ('dimension', 'normal_vector', 'constant_term', '_basepoint')
+
     NO_NONZERO_ELTS_FOUND_MSG = 'No nonzero elements found'
 
     def __init__(self, normal_vector=None, constant_term=None):
@@ -17,34 +19,47 @@ class Plane(object):
         if not normal_vector:
             all_zeros = ['0']*self.dimension
             normal_vector = Vector(all_zeros)
+        elif not isinstance(normal_vector, Vector):
+            normal_vector = Vector(normal_vector)
         self.normal_vector = normal_vector
 
         if not constant_term:
-            constant_term = Decimal('0')
-        self.constant_term = Decimal(constant_term)
+            constant_term = '0'
+        self.constant_term = to_scalar(constant_term, normal_vector.backend)
 
-        self.set_basepoint()
 
+    @property
+    def basepoint(self):
+        """A point on the plane, worked out the first time it is needed."""
+        try:
+            return self._basepoint
+        except AttributeError:
+            self.set_basepoint()
+            return self._basepoint
 
     def set_basepoint(self):
-        try:
-            n = self.normal_vector
-            c = self.constant_term
-            basepoint_coords = ['0']*self.dimension
+        n = self.normal_vector
+        c = self.constant_term
+        basepoint_coords = ['0']*self.dimension
 
-            initial_index = Plane.first_nonzero_index(n)
-            initial_coefficient = Decimal(n[initial_index])
+        initial_index = index_of_first_nonzero(n.coordinates)
+        if initial_index < 0:
+            self._basepoint = None
+            return
 
-            basepoint_coords[initial_index] = c/initial_coefficient
-            self.basepoint = Vector(basepoint_coords)
-            if not isinstance(self.normal_vector, Vector):
-                self.normal_vector = Vector(self.normal_vector)
+        initial_coefficient = to_scalar(n[initial_index], n.backend)
 
-        except Exception as e:
-            if str(e) == Plane.NO_NONZERO_ELTS_FOUND_MSG:
-                self.basepoint = None
-            else:
-                raise e
+        basepoint_coords[initial_index] = c/initial_coefficient
+        self._basepoint = Vector(basepoint_coords, n.backend)
+
+    def set_equation(self, normal_vector, constant_term):
+        """Change the coefficients in place; the basepoint is worked out again when needed."""
+        self.normal_vector = normal_vector
+        self.constant_term = to_scalar(constant_term, normal_vector.backend)
+        try:
+            del self._basepoint
+        except AttributeError:
+            pass
 
 
     def __str__(self):
@@ -73,18 +88,14 @@ class Plane(object):
 
         n = self.normal_vector
 
-        try:
-            initial_index = Plane.first_nonzero_index(n)
+        initial_index = index_of_first_nonzero(n.coordinates)
+        if initial_index < 0:
+            output = '0'
+        else:
             terms = [write_coefficient(n[i], is_initial_term=(i==initial_index)) + 'x_{}'.format(i+1)
                      for i in range(self.dimension) if round(n[i], num_decimal_places) != 0]
             output = ' '.join(terms)
 
-        except Exception as e:
-            if str(e) == self.NO_NONZERO_ELTS_FOUND_MSG:
-                output = '0'
-            else:
-                raise e
-
         constant = round(self.constant_term, num_decimal_places)
         if constant % 1 == 0:
             constant = int(constant)
@@ -103,7 +114,7 @@ class Plane(object):
                 return False
             else:
                 diff = self.constant_term - v.constant_term
-                return MyDecimal(diff).is_near_zero()
+                return is_near_zero(diff)
         elif v.normal_vector.is_zero():
             return False
         
@@ -141,10 +152,10 @@ class Plane(object):
     
     @staticmethod
     def first_nonzero_index(iterable):
-        for k, item in enumerate(iterable):
-            if not MyDecimal(item).is_near_zero():
-                return k
-        raise Exception(Plane.NO_NONZERO_ELTS_FOUND_MSG)
+        index = index_of_first_nonzero(iterable)
+        if index < 0:
+            raise Exception(Plane.NO_NONZERO_ELTS_FOUND_MSG)
+        return index
 
 
 class MyDecimal(Decimal):
@@ -0,0 +1,228 @@
+import heapq
+
+try:
+    import iterative
+except ImportError:
+    iterative = None
+
+import linsys
+from vector import Vector
+
+TOLERANCE = 1e-10
+
+
+class SparseLinearSystem(object):
+    """A linear system whose equations are stored as {column: coefficient} dicts.
+
+    Only the nonzero coefficients are kept, so memory and elimination time
+    grow with the number of nonzeros rather than equations x variables.
+    Elimination picks pivots with a Markowitz-style ordering (sparsest
+    column, then sparsest row among the numerically acceptable ones) to
+    limit fill-in.
+    """
+
+    ALL_ROWS_MUST_HAVE_CONSTANT_MSG = 'There must be one constant term per equation'
+    COLUMN_OUT_OF_RANGE_MSG = 'Coefficient column is outside the dimension of the system'
+
+    def __init__(self, rows, constant_terms, dimension, tolerance=TOLERANCE):
+        if len(rows) != len(constant_terms):
+            raise Exception(self.ALL_ROWS_MUST_HAVE_CONSTANT_MSG)
+
+        self.rows = []
+        for row in rows:
+            if isinstance(row, dict):
+                row = row.items()
+            sparse_row = {}
+            for col, value in row:
+                if not 0 <= col < dimension:
+                    raise Exception(self.COLUMN_OUT_OF_RANGE_MSG)
+                value = float(value)
+                if abs(value) > tolerance:
+                    sparse_row[col] = value
+            self.rows.append(sparse_row)
+
+        self.constant_terms = [float(c) for c in constant_terms]
+        self.dimension = dimension
+        self.tolerance = tolerance
+        self.pivot_columns = None
+
+    @classmethod
+    def from_linear_system(cls, system, tolerance=TOLERANCE):
+        rows = [[(col, value) for col, value in enumerate(p.normal_vector)]
+                for p in system.planes]
+        constant_terms = [p.constant_term for p in system.planes]
+        return cls(rows, constant_terms, system.dimension, tolerance)
+
+    def to_linear_system(self):
+        matrix = [[0.0] * (self.dimension + 1) for _ in self.rows]
+        for dense_row, row, constant_term in zip(matrix, self.rows, self.constant_terms):
+            for col, value in row.items():
+                dense_row[col] = value
+            dense_row[-1] = constant_term
+        return linsys.LinearSystem.from_matrix(matrix)
+
+    def nonzeros(self):
+        return sum(len(row) for row in self.rows)
+
+    def indices_of_first_nonzero_terms_in_each_row(self):
+        return [min(row) if row else -1 for row in self.rows]
+
+    def compute_rref(self):
+        """Return the reduced row echelon form as a new SparseLinearSystem.
+
+        The pivot of each row is recorded in pivot_columns. Pivots are chosen
+        to limit fill-in, so on rank deficient systems they need not be the
+        leftmost nonzero of their row and the free variables may differ from
+        the ones LinearSystem picks; the solution set is the same.
+        """
+        rows = [dict(row) for row in self.rows]
+        constant_terms = list(self.constant_terms)
+        pivots = self.eliminate(rows, constant_terms)
+
+        order = sorted(range(len(pivots)), key=lambda k: pivots[k][1])
+        pivot_rows = set(row for row, _ in pivots)
+        order = [pivots[k][0] for k in order]
+        order += [i for i in range(len(rows)) if i not in pivot_rows]
+
+        rref = SparseLinearSystem([], [], self.dimension, self.tolerance)
+        rref.rows = [rows[i] for i in order]
+        rref.constant_terms = [constant_terms[i] for i in order]
+        rref.pivot_columns = sorted(col for _, col in pivots)
+        rref.pivot_columns += [-1] * (len(rows) - len(pivots))
+        return rref
+
+    def eliminate(self, rows, constant_terms):
+        """Gauss-Jordan elimination in place; returns (row, column) pivots."""
+        tolerance = self.tolerance
+        active_rows = set(range(len(rows)))
+        col_rows = {}
+        for i, row in enumerate(rows):
+            for col in row:
+                col_rows.setdefault(col, set()).add(i)
+
+        heap = [(len(r), col) for col, r in col_rows.items()]
+        heapq.heapify(heap)
+        pivoted_cols = set()
+        pivots = []
+
+        while heap:
+            count, col = heapq.heappop(heap)
+            candidates = col_rows.get(col, ())
+            if col in pivoted_cols or count != len(candidates):
+                continue
+            if count == 0:
+                continue
+
+            # Threshold pivoting: among rows whose coefficient is within a
+            # factor of ten of the largest, take the one with fewest terms.
+            largest = max(abs(rows[i][col]) for i in candidates)
+            if largest <= tolerance:
+                continue
+            pivot_row = min((i for i in candidates
+                             if abs(rows[i][col]) >= 0.1 * largest),
+                            key=lambda i: (len(rows[i]), i))
+
+            pivoted_cols.add(col)
+            active_rows.discard(pivot_row)
+            for j in rows[pivot_row]:
+                col_rows[j].discard(pivot_row)
+            pivots.append((pivot_row, col))
+
+            touched = self.eliminate_column(rows, constant_terms, pivot_row, col,
+                                            list(candidates), col_rows)
+            for j in touched.union(rows[pivot_row]):
+                if j not in pivoted_cols:
+                    heapq.heappush(heap, (len(col_rows[j]), j))
+
+        # Back substitution: clear each pivot column from earlier pivot rows.
+        pivot_col_rows = {}
+        for pivot_row, _ in pivots:
+            for j in rows[pivot_row]:
+                pivot_col_rows.setdefault(j, set()).add(pivot_row)
+        for pivot_row, col in reversed(pivots):
+            pivot = rows[pivot_row][col]
+            for j in rows[pivot_row]:
+                rows[pivot_row][j] /= pivot
+            rows[pivot_row][col] = 1.0
+            constant_terms[pivot_row] /= pivot
+            others = [i for i in pivot_col_rows.get(col, ()) if i != pivot_row]
+            self.eliminate_column(rows, constant_terms, pivot_row, col, others, None)
+
+        return pivots
+
+    def eliminate_column(self, rows, constant_terms, pivot_row, col, targets, col_rows):
+        """Subtract multiples of the pivot row to zero col in the target rows."""
+        tolerance = self.tolerance
+        pivot = rows[pivot_row]
+        touched = set()
+        for i in targets:
+            row = rows[i]
+            factor = row[col] / pivot[col]
+            for j, value in pivot.items():
+                new_value = row.get(j, 0.0) - factor * value
+                if j == col or abs(new_value) <= tolerance:
+                    if j in row:
+                        del row[j]
+                        if col_rows is not None:
+                            col_rows[j].discard(i)
+                            touched.add(j)
+                else:
+                    if j not in row and col_rows is not None:
+                        col_rows.setdefault(j, set()).add(i)
+                        touched.add(j)
+                    row[j] = new_value
+            constant_terms[i] -= factor * constant_terms[pivot_row]
+        return touched
+
+    def compute_iterative_solution(self, method='cg', tolerance=TOLERANCE, max_iterations=None,
+                                   preconditioner=None, initial_guess=None):
+        """Solve iteratively; see LinearSystem.compute_iterative_solution."""
+        return iterative.solve(self, method, tolerance, max_iterations,
+                               preconditioner, initial_guess)
+
+    def raise_excepion_if_contradictory_equation(self):
+        for row, constant_term in zip(self.rows, self.constant_terms):
+            if not row and abs(constant_term) > self.tolerance:
+                raise Exception(linsys.LinearSystem.NO_SOLUTIONS_MSG)
+
+    def compute_solution(self):
+        """Return a Parametrization of the solutions, or NO_SOLUTIONS_MSG."""
+        rref = self.compute_rref()
+        try:
+            rref.raise_excepion_if_contradictory_equation()
+        except Exception as e:
+            if str(e) == linsys.LinearSystem.NO_SOLUTIONS_MSG:
+                return str(e)
+            else:
+                raise e
+
+        pivot_indices = rref.pivot_columns
+        basepoint_coords = [0] * self.dimension
+        free_var_rows = {}
+        for index, row in enumerate(rref.rows):
+            pivot_var = pivot_indices[index]
+            if pivot_var < 0:
+                break
+            basepoint_coords[pivot_var] = rref.constant_terms[index]
+            for col, value in row.items():
+                if col != pivot_var:
+                    free_var_rows.setdefault(col, []).append((pivot_var, value))
+
+        direction_vectors = []
+        free_variables = sorted(set(range(self.dimension)) - set(pivot_indices))
+        for free_var in free_variables:
+            vector_coords = [0] * self.dimension
+            vector_coords[free_var] = 1
+            for pivot_var, value in free_var_rows.get(free_var, ()):
+                vector_coords[pivot_var] = -value
+            direction_vectors.append(Vector(vector_coords))
+
+        return linsys.Parametrization(Vector(basepoint_coords), direction_vectors)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __str__(self):
+        ret = 'Sparse linear system: {} equations, {} variables, {} nonzeros'.format(
+            len(self), self.dimension, self.nonzeros())
+        return ret
@@ -0,0 +1,129 @@
+"""Compact on-disk storage for linear systems and out-of-core elimination.
+
+A system file is a 64 byte header followed by the augmented matrix as
+little-endian float64 rows and room for one int64 pivot column per row.
+The header records how far elimination has got, so a reduction running
+against the file can be checkpointed after every panel and resumed.
+"""
+import os
+import struct
+
+import numpy as np
+
+import dense
+import linsys
+from vector import Vector
+
+MAGIC = b'LINSYS01'
+HEADER = struct.Struct('<8s6Q')
+HEADER_SIZE = 64
+
+# Stages of the matrix stored in a file.
+SYSTEM = 0
+FORWARD = 1
+BACKWARD = 2
+RREF = 3
+
+
+class SystemFile(object):
+    """A linear system stored in a file and accessed through numpy.memmap."""
+
+    NOT_A_SYSTEM_FILE_MSG = 'Not a linear system file'
+    NOT_REDUCED_MSG = 'The system in this file has not been reduced to RREF yet'
+
+    def __init__(self, path, mode='r+'):
+        self.path = path
+        self.mode = mode
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+            raise Exception(self.NOT_A_SYSTEM_FILE_MSG)
+        (_, rows, columns, self.stage, self.next_row, self.next_col,
+         num_pivots) = HEADER.unpack(header[:HEADER.size])
+
+        self.matrix = np.memmap(path, dtype='<f8', mode=mode, offset=HEADER_SIZE,
+                                shape=(rows, columns))
+        pivot_storage = np.memmap(path, dtype='<i8', mode=mode,
+                                  offset=HEADER_SIZE + rows * columns * 8, shape=(rows,))
+        self.pivots = [int(p) for p in pivot_storage[:num_pivots]]
+        self.pivot_storage = pivot_storage
+
+    @classmethod
+    def create(cls, path, system, block_size=10000):
+        """Write a LinearSystem (or augmented array) to a new system file."""
+        if not isinstance(system, linsys.LinearSystem):
+            system = linsys.LinearSystem.from_array(np.asarray(system, dtype=np.float64))
+        rows, columns = len(system), system.dimension + 1
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, rows, columns, SYSTEM, 0, 0, 0).ljust(HEADER_SIZE, b'\0'))
+            for block in system.iter_blocks(block_size):
+                f.write(block.astype('<f8').tobytes())
+            f.write(np.zeros(rows, dtype='<i8').tobytes())
+        return cls(path)
+
+    def write_header(self):
+        rows, columns = self.matrix.shape
+        self.pivot_storage[:len(self.pivots)] = self.pivots
+        self.matrix.flush()
+        self.pivot_storage.flush()
+        with open(self.path, 'r+b') as f:
+            f.write(HEADER.pack(MAGIC, rows, columns, self.stage, self.next_row,
+                                self.next_col, len(self.pivots)))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def checkpoint_forward(self, row, col, pivots):
+        self.stage, self.next_row, self.next_col, self.pivots = FORWARD, row, col, pivots
+        self.write_header()
+
+    def checkpoint_backward(self, remaining):
+        self.stage, self.next_row = BACKWARD, remaining
+        self.write_header()
+
+    def compute_rref(self, tolerance=dense.TOLERANCE, panel_size=64, block_rows=4096):
+        """
+        Reduce the stored system to RREF in place, checkpointing after every
+        panel. Calling it again after an interruption resumes where the last
+        checkpoint left off.
+        """
+        if self.stage in (SYSTEM, FORWARD):
+            start = (self.next_row, self.next_col) if self.stage == FORWARD else (0, 0)
+            pivots = dense.blocked_triangular_form(
+                self.matrix, tolerance, panel_size, block_rows, start, self.pivots,
+                self.checkpoint_forward)
+            self.checkpoint_forward(len(pivots), self.matrix.shape[1] - 1, pivots)
+            self.checkpoint_backward(len(pivots))
+
+        if self.stage == BACKWARD:
+            dense.blocked_back_substitution(self.matrix, self.pivots, panel_size,
+                                            block_rows, self.next_row,
+                                            self.checkpoint_backward)
+            self.stage, self.next_row = RREF, 0
+            self.write_header()
+
+    def compute_solution(self):
+        """Parametrization (or NO_SOLUTIONS_MSG) of a file already in RREF."""
+        if self.stage != RREF:
+            raise Exception(self.NOT_REDUCED_MSG)
+        if dense.is_contradictory(self.matrix, self.pivots):
+            return linsys.LinearSystem.NO_SOLUTIONS_MSG
+        basepoint, direction_vectors = dense.parametrization(self.matrix, self.pivots)
+        return linsys.Parametrization(
+            Vector(list(basepoint)), [Vector(list(v)) for v in direction_vectors])
+
+    def to_linear_system(self):
+        """An array-backed LinearSystem reading straight from the file."""
+        return linsys.LinearSystem.from_array(self.matrix)
+
+
+def save_system(path, system, block_size=10000):
+    return SystemFile.create(path, system, block_size)
+
+
+def load_system(path, mmap=True):
+    """Load the matrix stored in a system file as a LinearSystem."""
+    system_file = SystemFile(path, mode='r')
+    if mmap:
+        return system_file.to_linear_system()
+    return linsys.LinearSystem.from_array(np.array(system_file.matrix))
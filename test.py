@@ -2,6 +2,7 @@ from linsys import LinearSystem
 from plane import Plane
 from line import Line
 from vector import Vector
+from vectorarray import VectorArray
 from decimal import Decimal, getcontext
 
 #Test case from Line
@@ -201,4 +202,713 @@ plane_9 = Plane(normal_vector=Vector([2.167, -13.543, -18.883]), constant_term='
 
 print('System 3')
 lin_sys_3 = LinearSystem([plane_6, plane_7, plane_8, plane_9])
-print(lin_sys_3.compute_solution())
\ No newline at end of file
+print(lin_sys_3.compute_solution())
+
+# Test for Vector backends
+print('\n Test for Vector backends:')
+
+for backend in ('decimal', 'float', 'numpy'):
+    v = Vector([3, 4, 0], backend)
+    w = Vector(['1', '-2', '5'], backend)
+    if not (v + w == Vector([4, 2, 5]) and
+            v - w == Vector([2, 6, -5]) and
+            v * w == -5 and
+            v * 2 == Vector([6, 8, 0]) and
+            v.magnitude() == 5 and
+            (v + w).backend == backend):
+        print ('test case {} failed'.format(backend))
+
+from vector import set_default_backend, BACKENDS
+
+set_default_backend('float')
+v = Vector([3, 4, 0], 'decimal')
+if not ((v * 2).backend == 'decimal' and v.normalized().backend == 'decimal' and
+        v.projectOn(Vector([1, 0, 0], 'decimal')).backend == 'decimal'):
+    print ('test case scaling failed')
+set_default_backend('decimal')
+
+for backend in BACKENDS:
+    l1 = Line(Vector([4.046, 2.836], backend), 1.21)
+    l2 = Line(Vector([7.204, 3.182], backend), 8.68)
+    point = l1.intersectionWith(l2)
+    if not (point.backend == backend and
+            (point - Vector([2.748251363, -3.494155506], backend)).magnitude() < 1e-8):
+        print ('test case intersection {} failed'.format(backend))
+
+# Test for VectorArray
+print('\n Test for VectorArray:')
+
+a = VectorArray([[3, 4, 0], [0, 0, 2], [6, 8, 0]])
+v = Vector([3, 4, 0])
+if not (list(a * v) == [25, 0, 50] and
+        list(a.magnitude()) == [5, 2, 10] and
+        list(a.isParallel(v)) == [True, False, True] and
+        a.projectOn(v)[1] == Vector([0, 0, 0]) and
+        a.crossProductOf(v)[1] == Vector([0, 0, 2]).crossProductOf(v)):
+    print ('test case 1 failed')
+
+b = VectorArray([[3, 4, 0], [0, 0, 0], [0, 0, 2]])
+unit, zero = b.normalized_nonzero()
+try:
+    b.normalized()
+    raised = False
+except Exception as e:
+    raised = str(e) == VectorArray.CANNOT_NORMALIZE_ZERO_VECTOR_MSG
+if not (raised and list(zero) == [False, True, False] and
+        unit[0] == Vector([0.6, 0.8, 0]) and unit[1] == Vector([0, 0, 0]) and
+        unit[2] == Vector([0, 0, 1])):
+    print ('test case 2 failed')
+
+# Test for the dense elimination engine
+print('\n Test for dense engine:')
+
+p1 = Plane(normal_vector=Vector(['0','1','1']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','-1','1']), constant_term='2')
+p3 = Plane(normal_vector=Vector(['1','2','-5']), constant_term='3')
+s = LinearSystem([p1,p2,p3])
+r = s.compute_rref(LinearSystem.DENSE_ENGINE)
+if not (r[0] == Plane(normal_vector=Vector(['1','0','0']), constant_term=Decimal('23')/Decimal('9')) and
+        r[1] == Plane(normal_vector=Vector(['0','1','0']), constant_term=Decimal('7')/Decimal('9')) and
+        r[2] == Plane(normal_vector=Vector(['0','0','1']), constant_term=Decimal('2')/Decimal('9'))):
+    print ('test case 1 failed')
+
+if lin_sys_1.compute_solution(LinearSystem.DENSE_ENGINE) != LinearSystem.NO_SOLUTIONS_MSG:
+    print ('test case 2 failed')
+
+print(lin_sys_3.compute_solution(LinearSystem.DENSE_ENGINE))
+
+# Test for pivoting modes
+print('\n Test for pivoting:')
+
+p1 = Plane(normal_vector=Vector(['1e-20','1','1']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','-1','1']), constant_term='2')
+p3 = Plane(normal_vector=Vector(['1','2','-5']), constant_term='3')
+s = LinearSystem([p1,p2,p3])
+t = s.compute_triangular_form(pivoting=LinearSystem.PARTIAL_PIVOTING)
+if not t[0] == p2:
+    print ('test case 1 failed')
+
+for pivoting in (LinearSystem.PARTIAL_PIVOTING, LinearSystem.COMPLETE_PIVOTING):
+    r = s.compute_rref(LinearSystem.DENSE_ENGINE, pivoting)
+    if not (r[0] == Plane(normal_vector=Vector(['1','0','0']), constant_term=Decimal('23')/Decimal('9')) and
+            r[2] == Plane(normal_vector=Vector(['0','0','1']), constant_term=Decimal('2')/Decimal('9'))):
+        print ('test case {} failed'.format(pivoting))
+
+# Test for LU factorization
+print('\n Test for LU factorization:')
+
+p1 = Plane(normal_vector=Vector(['0','1','1']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','-1','1']), constant_term='2')
+p3 = Plane(normal_vector=Vector(['1','2','-5']), constant_term='3')
+lu = LinearSystem([p1,p2,p3]).lu_factorization()
+solutions = lu.solve_many([[1, 0], [2, 0], [3, 0]])
+expected = Vector([Decimal(23)/9, Decimal(7)/9, Decimal(2)/9])
+if not ((solutions[0].basepoint - expected).is_zero() and
+        solutions[1].basepoint.is_zero() and
+        solutions[0].direction_vectors == []):
+    print ('test case 1 failed')
+
+p1 = Plane(normal_vector=Vector(['1','1','1']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','1','1']), constant_term='2')
+lu = LinearSystem([p1,p2]).lu_factorization()
+if not (lu.solve([1, 2]) == LinearSystem.NO_SOLUTIONS_MSG and
+        len(lu.solve([1, 1]).direction_vectors) == 2):
+    print ('test case 2 failed')
+
+# Test for sparse systems
+print('\n Test for sparse systems:')
+
+p1 = Plane(normal_vector=Vector(['0','1','1']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','-1','1']), constant_term='2')
+p3 = Plane(normal_vector=Vector(['1','2','-5']), constant_term='3')
+s = LinearSystem([p1,p2,p3]).to_sparse()
+solution = s.compute_solution()
+if not (s.nonzeros() == 8 and
+        (solution.basepoint - Vector([Decimal(23)/9, Decimal(7)/9, Decimal(2)/9])).is_zero()):
+    print ('test case 1 failed')
+
+if lin_sys_1.to_sparse().compute_solution() != LinearSystem.NO_SOLUTIONS_MSG:
+    print ('test case 2 failed')
+
+# Test for iterative solvers
+print('\n Test for iterative solvers:')
+
+p1 = Plane(normal_vector=Vector(['4','-1','0']), constant_term='3')
+p2 = Plane(normal_vector=Vector(['-1','4','-1']), constant_term='2')
+p3 = Plane(normal_vector=Vector(['0','-1','4']), constant_term='3')
+s = LinearSystem([p1,p2,p3])
+for method in ('cg', 'gmres', 'bicgstab', 'jacobi', 'gauss_seidel'):
+    result = s.compute_iterative_solution(method)
+    if not (result.converged and
+            (result.solution - Vector(['1','1','1'])).is_zero(1e-8)):
+        print ('test case {} failed'.format(method))
+
+import iterative
+
+swapped = LinearSystem([p3, p2, p1])
+failures = 0
+for system in (swapped, swapped.to_sparse()):
+    for method, preconditioner in (('jacobi', None), ('gauss_seidel', None), ('cg', 'jacobi')):
+        try:
+            iterative.solve(system, method, preconditioner=preconditioner)
+            failures += 1
+        except Exception as e:
+            if str(e) != iterative.ZERO_DIAGONAL_MSG:
+                failures += 1
+if failures:
+    print ('test case zero diagonal failed')
+
+# Test for least squares
+print('\n Test for least squares:')
+
+p1 = Plane(normal_vector=Vector(['1','0','0']), constant_term='1')
+p2 = Plane(normal_vector=Vector(['1','0','0']), constant_term='3')
+p3 = Plane(normal_vector=Vector(['0','1','0']), constant_term='2')
+p4 = Plane(normal_vector=Vector(['0','0','1']), constant_term='-1')
+s = LinearSystem([p1,p2,p3,p4])
+for method in ('qr', 'normal'):
+    result = s.compute_least_squares_solution(method, block_size=3)
+    if not ((result.solution - Vector(['2','2','-1'])).is_zero(1e-8) and
+            abs(result.residual_norm - 2 ** 0.5) < 1e-8):
+        print ('test case {} failed'.format(method))
+
+# Test for array-backed loading
+print('\n Test for loaders:')
+
+import loaders
+
+rows = ([float(c) for c in p.normal_vector] + [float(p.constant_term)]
+        for p in [plane_6, plane_7, plane_8, plane_9])
+s = loaders.from_rows(rows, block_size=3)
+if not (s.is_array_backed() and len(s) == 4 and s.dimension == 3):
+    print ('test case 1 failed')
+solution = s.compute_solution(LinearSystem.DENSE_ENGINE)
+if not (s.is_array_backed() and
+        (solution.basepoint - lin_sys_3.compute_solution().basepoint).is_zero(1e-8)):
+    print ('test case 2 failed')
+if not (s[1] == plane_7 and not s.is_array_backed()):
+    print ('test case 3 failed')
+
+import os
+import tempfile
+
+def load_error(contents, skip_header=0):
+    path = os.path.join(tempfile.mkdtemp(), 'empty.csv')
+    with open(path, 'w') as f:
+        f.write(contents)
+    try:
+        loaders.load_csv(path, skip_header=skip_header)
+    except Exception as e:
+        return str(e)
+    finally:
+        os.remove(path)
+
+if not (load_error('') == load_error('a,b,c,k\n', skip_header=1) ==
+        load_error('\n\n') == loaders.NO_EQUATIONS_MSG):
+    print ('test case 4 failed')
+
+# Test for blocked elimination and system files
+print('\n Test for blocked elimination:')
+
+import os
+import tempfile
+import numpy as np
+import storage
+
+solution = lin_sys_3.compute_solution(LinearSystem.BLOCKED_ENGINE)
+if not (solution.basepoint - lin_sys_3.compute_solution().basepoint).is_zero(1e-8):
+    print ('test case 1 failed')
+
+path = os.path.join(tempfile.mkdtemp(), 'system.bin')
+system_file = storage.save_system(path, lin_sys_2)
+system_file.compute_rref(panel_size=2, block_rows=1)
+if not (storage.SystemFile(path).stage == storage.RREF and
+        len(system_file.compute_solution().direction_vectors) == 1 and
+        len(storage.load_system(path)) == 3):
+    print ('test case 2 failed')
+os.remove(path)
+
+class Interrupted(Exception):
+    pass
+
+def interrupt_after_first(checkpoint):
+    def interrupting(*args):
+        checkpoint(*args)
+        raise Interrupted()
+    return interrupting
+
+rng = np.random.RandomState(10)
+coefficients = rng.uniform(-1, 1, size=(12, 9)) + 10 * np.eye(12, 9)
+matrix = np.column_stack((coefficients, coefficients.dot(rng.uniform(-1, 1, size=9))))
+directory = tempfile.mkdtemp()
+uninterrupted = storage.save_system(os.path.join(directory, 'whole.bin'), matrix)
+uninterrupted.compute_rref(panel_size=2, block_rows=3)
+for stage in ('forward', 'backward'):
+    path = os.path.join(directory, stage + '.bin')
+    system_file = storage.save_system(path, matrix)
+    name = 'checkpoint_' + stage
+    setattr(system_file, name, interrupt_after_first(getattr(system_file, name)))
+    try:
+        system_file.compute_rref(panel_size=2, block_rows=3)
+    except Interrupted:
+        pass
+    resumed = storage.SystemFile(path)
+    interrupted_stage = resumed.stage
+    resumed.compute_rref(panel_size=2, block_rows=3)
+    if not (interrupted_stage == getattr(storage, stage.upper()) and
+            resumed.stage == storage.RREF and resumed.pivots == uninterrupted.pivots and
+            np.allclose(resumed.matrix, uninterrupted.matrix) and
+            (resumed.compute_solution().basepoint -
+             uninterrupted.compute_solution().basepoint).is_zero(1e-8)):
+        print ('test case {} failed'.format(3 if stage == 'forward' else 4))
+    del system_file, resumed
+    os.remove(path)
+
+# Test for batched small systems
+print('\n Test for batched systems:')
+
+import batch
+
+systems = [lin_sys_1.to_matrix().tolist() + [[0, 0, 0, 0]],
+           lin_sys_2.to_matrix().tolist(),
+           lin_sys_3.to_matrix()[:3].tolist()]
+status, solutions, rank = batch.solve_batch(systems)
+if not (list(status) == [batch.NO_SOLUTIONS, batch.INFINITE_SOLUTIONS, batch.UNIQUE] and
+        list(rank) == [1, 2, 3] and
+        (Vector(list(solutions[2])) - lin_sys_3.compute_solution().basepoint).is_zero(1e-8)):
+    print ('test case 1 failed')
+
+# Test for LineSet
+print('\n Test for LineSet:')
+
+from lineset import LineSet
+
+A, B = Line(Vector([4.046, 2.836]), 1.21), Line(Vector([10.115, 7.09]), 3.025)
+C, D = Line(Vector([7.204, 3.182]), 8.68), Line(Vector([8.172, 4.114]), 9.883)
+lines = LineSet([A, B, C, D])
+points, parallel, coincident = lines.intersections(LineSet([B, D]))
+if not (parallel[0, 0] and coincident[0, 0] and
+        not parallel[2, 1] and
+        (Vector(list(points[2, 1])) - C.intersectionWith(D)).is_zero(1e-8)):
+    print ('test case 1 failed')
+
+# Test for HyperplaneIndex
+print('\n Test for HyperplaneIndex:')
+
+from hyperindex import HyperplaneIndex
+
+planes = [Plane(Vector(['1','0','0']), '1'), Plane(Vector(['0','2','0']), '4'),
+          Plane(Vector(['-1','0','0']), '3'), Plane(Vector(['0','0','1']), '-5')]
+index = HyperplaneIndex(planes)
+indices, distances = index.nearest([[0, 0, 0], [0, 1.8, -4.5]], k=2)
+if not (list(indices[0]) == [0, 1] and list(distances[0]) == [1, 2] and
+        list(indices[1]) == [1, 3] and
+        list(index.side([[0, 0, 0]])[0]) == [-1, -1, -1, 1]):
+    print ('test case 1 failed')
+
+# Test for immutable Vectors
+print('\n Test for immutable Vectors:')
+
+v = Vector(['3', '4'])
+try:
+    v.coordinates = (Decimal(1), Decimal(1))
+    print ('test case 1 failed')
+except AttributeError:
+    pass
+if not (v.magnitude() is v.magnitude() and
+        v.normalized() is v.normalized() and
+        {v: 'a'}[Vector([3.0, 4.0])] == 'a'):
+    print ('test case 2 failed')
+
+# Test for slotted planes and the array backend
+print('\n Test for slotted planes and the array backend:')
+
+p = Plane(Vector(['0', '2', '1']), '4')
+if hasattr(p, '__dict__') or p.basepoint != Vector(['0', '2', '0']):
+    print ('test case 1 failed')
+
+v = Vector(['3', '4'], 'array')
+w = Vector([1, 2], 'array')
+if not (v.magnitude() == 5 and v * w == 11 and
+        (v + w) == Vector([4, 6]) and (v * 2).backend == 'array' and
+        hash(v) == hash(Vector([3.0, 4.0], 'float'))):
+    print ('test case 2 failed')
+
+# Test for the fraction backend and exact engine
+print('\n Test for the fraction backend and exact engine:')
+
+from fractions import Fraction
+import exact
+
+p1 = Plane(Vector([1, 2, 3]), 4)
+p2 = Plane(Vector([2, 1, 3]), 1)
+p3 = Plane(Vector([0, 2, 7]), 5)
+expected = Vector([Fraction(-11, 15), Fraction(34, 15), Fraction(1, 15)], 'fraction')
+solution = LinearSystem([p1, p2, p3]).compute_solution(engine='exact')
+if not (solution.basepoint == expected and solution.basepoint.backend == 'fraction'):
+    print ('test case 1 failed')
+
+fraction_system = LinearSystem([Plane(Vector(p.normal_vector.coordinates, 'fraction'), p.constant_term)
+                                for p in (p1, p2, p3)])
+if fraction_system.compute_solution().basepoint != expected:
+    print ('test case 2 failed')
+
+# 1e-13 is below the tolerance of the other engines but not zero.
+p4 = Plane(Vector(['0.1', '0.2', '0.3']), '0.4')
+p5 = Plane(Vector(['0.2', '0.4', '0.6']), '0.8000000000001')
+if not (LinearSystem([p4, p5]).compute_solution(engine='exact') == LinearSystem.NO_SOLUTIONS_MSG and
+        exact.determinant([[2, 1], [7, Fraction(1, 2)]]) == Fraction(-6)):
+    print ('test case 3 failed')
+
+# Test for the modular engine
+print('\n Test for the modular engine:')
+
+import modular
+
+if LinearSystem([p1, p2, p3]).compute_solution(engine='modular').basepoint != expected:
+    print ('test case 1 failed')
+
+if not (LinearSystem([p4, p5]).compute_solution(engine='modular') == LinearSystem.NO_SOLUTIONS_MSG and
+        modular.determinant([[2, 1], [7, Fraction(1, 2)]]) == Fraction(-6) and
+        modular.rank([[1, 2, 3], [2, 4, 6], [1, 0, 1]]) == 2):
+    print ('test case 2 failed')
+
+big = [[(i * 7919 + j * 104729) % 1000003 - 500000 for j in range(9)] for i in range(8)]
+if modular.rref(big) != exact.rref(big):
+    print ('test case 3 failed')
+
+# Test for rank, determinant and inverse
+print('\n Test for rank, determinant and inverse:')
+
+s = LinearSystem([p1, p2, p3])
+factorization = s.lu_factorization()
+inverse = s.inverse()
+if not (s.rank() == 3 and s.nullity() == 0 and abs(s.determinant() + 15) < 1e-9 and
+        s.lu_factorization() is factorization and
+        abs(inverse.dot([4, 1, 5]) - [-11/15, 34/15, 1/15]).max() < 1e-9 and
+        (s.compute_solution(engine='lu').basepoint - expected).is_zero(1e-9)):
+    print ('test case 1 failed')
+
+s[2] = Plane(Vector([3, 3, 6]), 6)
+if not (s.lu_factorization() is not factorization and s.rank() == 2 and
+        s.nullity() == 1 and s.determinant() == 0 and
+        s.compute_solution(engine='lu') == LinearSystem.NO_SOLUTIONS_MSG):
+    print ('test case 2 failed')
+
+# Test for IncrementalLinearSystem
+print('\n Test for IncrementalLinearSystem:')
+
+from incremental import IncrementalLinearSystem
+
+incremental = IncrementalLinearSystem(3, [p1, p2])
+if not isinstance(incremental.compute_solution().direction_vectors[0], Vector):
+    print ('test case 1 failed')
+
+incremental.append(Plane(Vector([1, 1, 1]), 0))
+incremental.append(p3)
+incremental.remove(2)
+if (Vector(list(incremental.compute_solution().basepoint)) - expected).is_zero(1e-9) is not True:
+    print ('test case 2 failed')
+
+incremental.set_constant_term(1, 2)
+dense_solution = incremental.to_linear_system().compute_solution(engine='dense')
+if not ((incremental.compute_solution().basepoint - dense_solution.basepoint).is_zero(1e-9) and
+        len(incremental) == 3):
+    print ('test case 3 failed')
+
+incremental.append(Plane(Vector([1, 1, 1]), 0))
+if incremental.compute_solution() != LinearSystem.NO_SOLUTIONS_MSG:
+    print ('test case 4 failed')
+
+# Test for threaded blocked elimination
+print('\n Test for threaded blocked elimination:')
+
+import dense
+import numpy as np
+
+matrix = np.random.RandomState(0).rand(300, 301)
+serial, threaded = matrix.copy(), matrix.copy()
+serial_pivots = dense.blocked_rref(serial, panel_size=16, block_rows=32)
+threaded_pivots = dense.blocked_rref(threaded, panel_size=16, block_rows=32, workers=4)
+if not (serial_pivots == threaded_pivots and np.array_equal(serial, threaded)):
+    print ('test case 1 failed')
+
+s = LinearSystem([p1, p2, p3])
+if (s.compute_solution(engine='blocked', workers=2).basepoint - expected).is_zero(1e-9) is not True:
+    print ('test case 2 failed')
+
+# Test for the benchmarks
+print('\n Test for the benchmarks:')
+
+import bench
+
+results = bench.run_benchmarks(sizes=[3], densities=[1.0], backends=['float'],
+                               engines=['dense', 'lu'], repeats=1)
+names = set(r['name'] for r in results['results'])
+if not ('linsys.compute_solution' in names and 'vector.projectOn' in names and
+        'line.intersectionWith' in names and
+        all(r['seconds'] > 0 for r in results['results'])):
+    print ('test case 1 failed')
+
+baseline = {'results': [dict(r, seconds=r['seconds'] / 10) for r in results['results']]}
+regressions, improvements = bench.compare(results, baseline)
+if not (len(regressions) == len(results['results']) and improvements == [] and
+        bench.compare(results, results) == ([], [])):
+    print ('test case 2 failed')
+
+import json
+with open(bench.BASELINE) as f:
+    reference = json.load(f)
+matched = set(map(bench.case_key, reference['results'])) & set(map(bench.case_key, results['results']))
+if not (bench.parse_arguments(['--compare']).compare == bench.BASELINE and
+        len(matched) == len(results['results'])):
+    print ('test case 3 failed')
+
+# Test for instrumentation
+print('\n Test for instrumentation:')
+
+import instrument
+from collections import Counter
+
+events = []
+with instrument.collect(instrument.Stats([lambda *event: events.append(event)])) as stats:
+    solution = LinearSystem([p1, p2, p3]).compute_solution()
+counters = stats.as_dict()['counters']
+if not (counters['row_ops'] > 0 and counters['allocations'] == 9 and
+        counters['pivots_tested'] > 0 and ('count', 'row_ops', 1) in events and
+        set(stats.calls) == {'triangular', 'rref', 'parametrization'} and
+        stats.metrics()['linsys.phase.rref.calls'] == 1 and instrument.active is None):
+    print ('test case 1 failed')
+
+LinearSystem([p1, p2, p3]).compute_solution()
+if stats.counters != Counter(counters):
+    print ('test case 2 failed')
+
+# Test for the pivot index search
+print('\n Test for the pivot index search:')
+
+from vector import index_of_first_nonzero
+
+if not (index_of_first_nonzero([0, 1e-12, 2, 3]) == 2 and
+        index_of_first_nonzero(np.array([0.0, 0.0])) == -1 and
+        index_of_first_nonzero((Fraction(0), Fraction(1, 10**20))) == 1):
+    print ('test case 1 failed')
+
+matrix = np.array([[0.0, 2.0, 1.0], [0.0, 0.0, 0.0], [0.0, 0.0, 3.0]])
+s = LinearSystem.from_array(matrix)
+if not (s.indices_of_first_nonzero_terms_in_each_row() == [1, -1, -1] and
+        LinearSystem.from_array(matrix[:2]).compute_rref().indices_of_first_nonzero_terms_in_each_row() == [1, -1]):
+    print ('test case 2 failed')
+
+try:
+    s.raise_excepion_if_contradictory_equation()
+    print ('test case 3 failed')
+except Exception as e:
+    if str(e) != LinearSystem.NO_SOLUTIONS_MSG or not s.is_array_backed():
+        print ('test case 3 failed')
+
+if not (Plane(Vector([0, 0, 0]), 1).basepoint is None and
+        str(Plane(Vector([0, 0, 0]), 1)) == '0 = 1'):
+    print ('test case 4 failed')
+
+# Test for in-place elimination
+print('\n Test for in-place elimination:')
+
+q1, q2, q3 = (Plane(p.normal_vector, p.constant_term) for p in (p1, p2, p3))
+s = LinearSystem([q1, q2, q3])
+q1.basepoint
+copied = s.compute_rref()
+reduced = s.compute_rref(copy=False)
+if not (reduced is s and set(map(id, s.planes)) == set(map(id, (q1, q2, q3))) and
+        all(p == q for p, q in zip(s.planes, copied.planes)) and
+        s[0].basepoint == copied[0].basepoint and copied[0] is not s[0]):
+    print ('test case 1 failed')
+
+s = LinearSystem([Plane(p.normal_vector, p.constant_term) for p in (p1, p2, p3)])
+if (s.compute_solution(copy=False).basepoint - expected).is_zero(1e-9) is not True:
+    print ('test case 2 failed')
+
+# Test for the solve cache
+print('\n Test for the solve cache:')
+
+from cache import SolveCache
+
+solves = SolveCache(max_entries=2)
+first = LinearSystem([p1, p2, p3]).compute_solution(cache=solves)
+again = LinearSystem([Plane(p.normal_vector, p.constant_term) for p in (p1, p2, p3)]).compute_solution(cache=solves)
+if not (again is first and solves.stats()['hits'] == 1 and solves.stats()['misses'] == 1):
+    print ('test case 1 failed')
+
+permuted = LinearSystem([p3 * -2, p1, p2 * 3])
+if permuted.compute_solution(cache=solves) is first:
+    print ('test case 2 failed')
+canonical = SolveCache(canonical=True)
+if not (LinearSystem([p1, p2, p3]).compute_solution(cache=canonical) is
+        permuted.compute_solution(cache=canonical) and canonical.hits == 1):
+    print ('test case 3 failed')
+
+matrix = np.array([[1.0, 1.0, 2.0], [1.0, -1.0, 0.0]])
+floats = SolveCache(canonical=True)
+LinearSystem.from_array(matrix).compute_solution(engine='dense', cache=floats)
+LinearSystem.from_array(matrix[::-1] * [[0.1], [-3.0]]).compute_solution(engine='dense', cache=floats)
+LinearSystem([p1, p2]).compute_solution(cache=solves)
+if not (floats.hits == 1 and len(solves) == 2 and solves.evictions == 1 and
+        SolveCache(max_bytes=10).compute_solution(LinearSystem([p1, p2, p3])) is not None):
+    print ('test case 4 failed')
+
+arrays = SolveCache()
+stored = LinearSystem.from_array(matrix)
+first = stored.compute_solution(cache=arrays)
+materialized = LinearSystem.from_array(matrix)
+materialized.planes
+if not (stored.compute_solution(cache=arrays) is first and
+        materialized.compute_solution(cache=arrays) is first and
+        arrays.stats()['misses'] == 1 and arrays.hits == 2 and len(arrays) == 1):
+    print ('test case 5 failed')
+
+from cache import CACHE_NEEDS_COPY_MSG
+
+def cached_in_place(cache):
+    system = LinearSystem([p1, p2, p3])
+    try:
+        system.compute_solution(cache=cache, copy=False)
+    except Exception as e:
+        return str(e) == CACHE_NEEDS_COPY_MSG and system.planes[0] is p1
+
+reused = SolveCache()
+LinearSystem([p1, p2, p3]).compute_solution(cache=reused)
+if not (cached_in_place(SolveCache()) and cached_in_place(reused) and reused.hits == 0):
+    print ('test case 6 failed')
+
+close = SolveCache(canonical=True)
+near = np.array([[1.0, 1.0, 2.0], [1.0, -1.0, 1e-12]])
+first = LinearSystem.from_array(matrix).compute_solution(engine='dense', cache=close)
+second = LinearSystem.from_array(near).compute_solution(engine='dense', cache=close)
+if not (close.hits == 0 and len(close) == 2 and second is not first and
+        abs(float(second.basepoint[0]) - float(first.basepoint[0]) - 5e-13) < 1e-15):
+    print ('test case 7 failed')
+
+# Test for pivoting errors
+print('\n Test for pivoting errors:')
+
+def pivoting_error(engine, pivoting, method='compute_rref'):
+    try:
+        getattr(LinearSystem([p1, p2, p3]), method)(engine=engine, pivoting=pivoting)
+    except Exception as e:
+        return type(e), str(e)
+
+unknown = (Exception, LinearSystem.UNKNOWN_PIVOTING_MSG)
+complete = (Exception, LinearSystem.COMPLETE_PIVOTING_NEEDS_DENSE_ENGINE_MSG)
+if not (pivoting_error('planes', 'sideways') == pivoting_error('dense', 'sideways') ==
+        pivoting_error('blocked', 'sideways') == unknown and
+        pivoting_error('planes', 'complete') == pivoting_error('blocked', 'complete') ==
+        pivoting_error('dense', 'complete', 'compute_triangular_form') == complete and
+        pivoting_error('dense', 'complete') is None):
+    print ('test case 1 failed')
+
+# Test for HyperplaneIndex against brute force
+print('\n Test for HyperplaneIndex against brute force:')
+
+rng = np.random.RandomState(13)
+mismatches = 0
+for trial in range(200):
+    dimension = rng.randint(1, 4)
+    count = rng.randint(1, 30)
+    normals = rng.randint(-3, 4, size=(count, dimension)).astype(float)
+    normals[~normals.any(axis=1), 0] = 1.0
+    constants = rng.randint(-5, 6, size=count).astype(float)
+    points = rng.uniform(-1, 1, size=(3, dimension)) * 10.0 ** rng.randint(0, 7)
+    k = rng.randint(1, 5)
+    indices, distances = HyperplaneIndex.from_arrays(normals, constants).nearest(points, k=k)
+    brute = np.sort(np.abs(points.dot(normals.T) - constants) /
+                    np.linalg.norm(normals, axis=1), axis=1)[:, :k]
+    if not (distances.shape == brute.shape and np.allclose(distances, brute, rtol=1e-9)):
+        mismatches += 1
+_, far = HyperplaneIndex.from_arrays([[-0.0951]], [-0.0129]).nearest([[-216.5077]], k=1)
+if not (mismatches == 0 and far.shape == (1, 1)):
+    print ('test case 1 failed')
+
+directions = rng.randint(-3, 4, size=(5, 3)).astype(float)
+directions[~directions.any(axis=1), 0] = 1.0
+normals = directions[rng.randint(0, 5, size=5000)] * rng.uniform(0.5, 2, size=(5000, 1))
+constants = rng.uniform(-100, 100, size=5000)
+points = rng.uniform(-1, 1, size=(20, 3)) * 10.0 ** rng.randint(0, 7, size=(20, 1))
+clustered = HyperplaneIndex.from_arrays(normals, constants)
+_, distances = clustered.nearest(points, k=3)
+brute = np.sort(np.abs(points.dot(normals.T) - constants) /
+                np.linalg.norm(normals, axis=1), axis=1)[:, :3]
+if not (not clustered.scan_only and np.allclose(distances, brute, rtol=1e-9)):
+    print ('test case 2 failed')
+
+normals = rng.randn(2000, 5)
+constants = rng.randn(2000)
+points = rng.randn(10, 5) * 100
+generic = HyperplaneIndex.from_arrays(normals, constants)
+_, distances = generic.nearest(points, k=3)
+brute = np.sort(np.abs(points.dot(normals.T) - constants) /
+                np.linalg.norm(normals, axis=1), axis=1)[:, :3]
+if not (generic.scan_only and np.allclose(distances, brute, rtol=1e-9)):
+    print ('test case 3 failed')
+
+# Test for Vector equality across backends
+print('\n Test for Vector equality across backends:')
+
+tenth = Vector(['0.1'], 'decimal')
+keys = {tenth: 'decimal', Vector([0.1], 'numpy'): 'numpy', Vector([0.5], 'numpy'): 'half'}
+if not (tenth != Vector([0.1], 'numpy') and len(keys) == 3 and
+        keys[Vector(['0.5'], 'decimal')] == 'half' and
+        keys[Vector([0.1], 'float')] == 'numpy' and
+        Vector([Fraction(1, 2)], 'fraction') == Vector([0.5], 'numpy') and
+        hash(Vector([Fraction(1, 2)], 'fraction')) == hash(Vector([0.5], 'array'))):
+    print ('test case 1 failed')
+
+# Test for planes engine pivot columns
+print('\n Test for planes engine pivot columns:')
+
+def solves(solution, rows, directions):
+    coefficients = np.array([row[:-1] for row in rows], dtype=float)
+    constants = np.array([row[-1] for row in rows], dtype=float)
+    basepoint = np.array([float(a) for a in solution.basepoint])
+    return (np.allclose(coefficients.dot(basepoint), constants) and
+            len(solution.direction_vectors) == directions and
+            all(np.allclose(coefficients.dot([float(a) for a in v]), 0)
+                for v in solution.direction_vectors))
+
+# The second column is zero, so the pivots of the last rows are off the diagonal.
+zero_column = [[1, 0, 2, 1], [2, 0, 5, 3], [0, 0, 1, 1]]
+# In floats 0.3 - 3 * 0.1 leaves about 1e-17, which must not be taken as a pivot.
+leftover = [['1', '3', '1', '1'], ['0.1', '0.3', '0.2', '0.5']]
+failed = False
+for backend in ('float', 'numpy', 'decimal', 'fraction'):
+    for pivoting in (LinearSystem.NO_PIVOTING, LinearSystem.PARTIAL_PIVOTING):
+        for rows, directions in ((zero_column, 1), (leftover, 1)):
+            system = LinearSystem([Plane(Vector(row[:-1], backend), row[-1]) for row in rows])
+            if not solves(system.compute_solution(pivoting=pivoting), rows, directions):
+                failed = True
+if failed:
+    print ('test case 1 failed')
+
+# Test for Hyperplane arithmetic
+print('\n Test for Hyperplane arithmetic:')
+
+from hyperplane import Hyperplane
+
+h1 = Hyperplane(normal_vector=Vector([1, 2, 0, -1]), constant_term=3)
+h2 = Hyperplane(normal_vector=Vector([0, 1, 1, 1]), constant_term=-1)
+if not ((h1 + h2).normal_vector == Vector([1, 3, 1, 0]) and (h1 + h2).constant_term == 2 and
+        (h1 - h2).normal_vector == Vector([1, 1, -1, -2]) and (h1 - h2).constant_term == 4 and
+        (h2 * 2).normal_vector == Vector([0, 2, 2, 2]) and (h2 * 2).constant_term == -2 and
+        isinstance(h1 + h2, Hyperplane)):
+    print ('test case 1 failed')
+
+s = LinearSystem([h1, h2])
+s.multiply_coefficient_and_row(2, 1)
+s.add_multiple_times_row_to_row(-1, 1, 0)
+if not (s[0].normal_vector == Vector([1, 0, -2, -3]) and s[0].constant_term == 5 and
+        s[1].normal_vector == Vector([0, 2, 2, 2])):
+    print ('test case 2 failed')
+try:
+    h1 * 'x'
+    print ('test case 3 failed')
+except TypeError:
+    pass
@@ -1,52 +1,200 @@
+from array import array
 from math import acos, pi, sqrt
 from decimal import Decimal, getcontext
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 getcontext().prec = 30
 
+# Numeric backends a Vector can store its coordinates in.
+DECIMAL = 'decimal'
+FLOAT = 'float'
+NUMPY = 'numpy'
+# Floats packed into an array('d'): no float object per coordinate.
+ARRAY = 'array'
+# Exact rationals: no rounding, and zero means exactly zero.
+FRACTION = 'fraction'
+BACKENDS = (DECIMAL, FLOAT, NUMPY, ARRAY, FRACTION)
+
+default_backend = DECIMAL
+
+
+def set_default_backend(backend):
+    """Select the backend used by Vectors created without an explicit one."""
+    global default_backend
+    check_backend(backend)
+    default_backend = backend
+
+
+def check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend {!r}, expected one of {}'.format(
+            backend, BACKENDS))
+    if backend == NUMPY and np is None:
+        raise ImportError('The numpy backend requires numpy to be installed')
+
+
+def to_scalar(value, backend):
+    """Convert a number to the scalar type used by the given backend."""
+    if backend == DECIMAL:
+        if isinstance(value, Fraction):
+            return Decimal(value.numerator) / Decimal(value.denominator)
+        return Decimal(value)
+    elif backend == FRACTION:
+        return Fraction(value)
+    return float(value)
+
+
+def is_near_zero(value, eps=1e-10):
+    """Whether a scalar is zero, up to eps unless it is an exact Fraction."""
+    if isinstance(value, Fraction):
+        return value == 0
+    return abs(value) < eps
+
+
+def index_of_first_nonzero(values, eps=1e-10):
+    """Index of the first value that is not near zero, or -1 if they all are."""
+    if np is not None and isinstance(values, np.ndarray):
+        nonzero = np.flatnonzero(np.abs(values) >= eps)
+        return int(nonzero[0]) if len(nonzero) else -1
+    for k, value in enumerate(values):
+        if not is_near_zero(value, eps):
+            return k
+    return -1
+
+
 class Vector(object):
-    
+    """An immutable vector.
+
+    Vectors cannot be changed after construction, which lets them cache
+    their magnitude, normalized form and hash the first time those are
+    needed, and be used as dict keys and set members. The array backend
+    cannot make its array('d') read-only, so it must not be written to.
+    """
+
+    __slots__ = ('coordinates', 'dimension', 'backend',
+                 '_magnitude', '_normalized', '_hash')
+
     CANNOT_NORMALIZE_ZERO_VECTOR_MSG = 'Cannot normalize the zero vector'
     NO_UNIQUE_PARALLEL_COMP_MSG = 'There''s no unique vector, bra.'
+    VECTORS_ARE_IMMUTABLE_MSG = 'Vectors are immutable'
     
-    def __init__(self, coordinates):
+    def __init__(self, coordinates, backend=None):
+        if backend is None:
+            backend = default_backend
+        check_backend(backend)
+        initialize = object.__setattr__
+        initialize(self, 'backend', backend)
+        initialize(self, '_magnitude', None)
+        initialize(self, '_normalized', None)
+        initialize(self, '_hash', None)
+
         try:
-            if not coordinates:
+            if len(coordinates) == 0:
                 raise ValueError
-            self.coordinates = tuple([Decimal(a) for a in coordinates])
-            self.dimension = len(coordinates)
+            if backend == NUMPY:
+                coordinates = np.array(coordinates, dtype=np.float64)
+                coordinates.flags.writeable = False
+                initialize(self, 'coordinates', coordinates)
+            elif backend == FLOAT:
+                initialize(self, 'coordinates', tuple([float(a) for a in coordinates]))
+            elif backend == ARRAY:
+                initialize(self, 'coordinates', array('d', [float(a) for a in coordinates]))
+            elif backend == FRACTION:
+                initialize(self, 'coordinates', tuple([Fraction(a) for a in coordinates]))
+            else:
+                initialize(self, 'coordinates', tuple([to_scalar(a, DECIMAL) for a in coordinates]))
+            initialize(self, 'dimension', len(coordinates))
 
         except ValueError:
             raise ValueError('The coordinates must be nonempty')
 
         except TypeError:
             raise TypeError('The coordinates must be an iterable')
+
+    def __setattr__(self, name, value):
+        raise AttributeError(self.VECTORS_ARE_IMMUTABLE_MSG)
+
+    def __delattr__(self, name):
+        raise AttributeError(self.VECTORS_ARE_IMMUTABLE_MSG)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (Vector, (self.coordinates, self.backend))
     
+    def coordinates_for(self, backend):
+        """Return the coordinates converted to the storage of another backend."""
+        if backend == self.backend:
+            return self.coordinates
+        return Vector(self.coordinates, backend).coordinates
+
     def __add__(self, v):
-        new_coordinates = [x+y for x,y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        other = v.coordinates_for(self.backend)
+        if self.backend == NUMPY:
+            return Vector(self.coordinates + other, NUMPY)
+        new_coordinates = [x+y for x,y in zip(self.coordinates, other)]
+        return Vector(new_coordinates, self.backend)
     
     def __sub__(self, v):
-        new_coordinates = [x-y for x,y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        other = v.coordinates_for(self.backend)
+        if self.backend == NUMPY:
+            return Vector(self.coordinates - other, NUMPY)
+        new_coordinates = [x-y for x,y in zip(self.coordinates, other)]
+        return Vector(new_coordinates, self.backend)
         
     def __mul__(self, c):
         if isinstance(c, Vector):
-            result = [x*y for x, y in zip(self.coordinates, c.coordinates)]
+            other = c.coordinates_for(self.backend)
+            if self.backend == NUMPY:
+                return float(np.dot(self.coordinates, other))
+            result = [x*y for x, y in zip(self.coordinates, other)]
             return sum(result)
+        elif self.backend == NUMPY:
+            return Vector(self.coordinates * float(c), NUMPY)
+        elif self.backend in (FLOAT, ARRAY):
+            return Vector([x*float(c) for x in self.coordinates], self.backend)
+        elif self.backend == FRACTION:
+            c = Fraction(c)
+            return Vector([x*c for x in self.coordinates], FRACTION)
         else:
-            return Vector([x*c for x in self.coordinates])
+            return Vector([x*c for x in self.coordinates], DECIMAL)
         
     def magnitude(self):
-        coordinates_squared = [x**2 for x in self.coordinates]
-        return Decimal(sqrt(sum(coordinates_squared)))
+        if self._magnitude is not None:
+            return self._magnitude
+        if self.backend == NUMPY:
+            magnitude = float(np.sqrt(np.dot(self.coordinates, self.coordinates)))
+        else:
+            coordinates_squared = [x**2 for x in self.coordinates]
+            if self.backend in (FLOAT, ARRAY, FRACTION):
+                magnitude = sqrt(sum(coordinates_squared))
+            else:
+                magnitude = Decimal(sqrt(sum(coordinates_squared)))
+        object.__setattr__(self, '_magnitude', magnitude)
+        return magnitude
             
     def is_zero(self, tolerance=1e-10):
+        if self.backend == FRACTION:
+            return not any(self.coordinates)
         return abs(self.magnitude()) < tolerance
     
     def normalized(self):
+        if self._normalized is not None:
+            return self._normalized
         try:
-            magnitude = Decimal(self.magnitude())
-            return self*(Decimal('1.0')/magnitude)
+            magnitude = to_scalar(self.magnitude(), self.backend)
+            normalized = self*(to_scalar('1.0', self.backend)/magnitude)
+            object.__setattr__(self, '_normalized', normalized)
+            return normalized
         
         except ZeroDivisionError:
             raise Exception(self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG)
@@ -94,7 +242,7 @@ class Vector(object):
             new_coordinate = [a[1]*b[2] - a[2]*b[1],
                               a[2]*b[0] - a[0]*b[2],
                               a[0]*b[1] - a[1]*b[0]]
-            return Vector(new_coordinate)
+            return Vector(new_coordinate, self.backend)
             
         except ValueError as e:
             msg = str(e)
@@ -111,10 +259,13 @@ class Vector(object):
         return self.crossProductOf(w).magnitude()
         
     def triArea(self, w):
-        return Decimal(0.5)*self.paraArea(w)
+        return to_scalar(0.5, self.backend)*self.paraArea(w)
         
     def isParallel(self, v):
-        return(self.is_zero() or v.is_zero() or self.angle(v) == 0 or self.angle(v) == pi)
+        if self.is_zero() or v.is_zero():
+            return True
+        angle = self.angle(v)
+        return angle == 0 or angle == pi
     
     def isOrthogonal(self, v, tolerance=1e-10):
         return abs(self*v)<tolerance
@@ -126,7 +277,26 @@ class Vector(object):
         return iter(self.coordinates)
         
     def __str__(self):
+        if self.backend == NUMPY:
+            return 'Vector: {}'.format(tuple(self.coordinates.tolist()))
+        if self.backend == ARRAY:
+            return 'Vector: {}'.format(tuple(self.coordinates))
         return 'Vector: {}'.format(self.coordinates)
 
+    def _coordinate_tuple(self):
+        """The coordinates as a tuple of Python scalars, compared exactly as they are."""
+        if self.backend == NUMPY:
+            return tuple(self.coordinates.tolist())
+        if self.backend == ARRAY:
+            return tuple(self.coordinates)
+        return self.coordinates
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(self._coordinate_tuple()))
+        return self._hash
+
     def __eq__(self, v):
-        return self.coordinates == v.coordinates
\ No newline at end of file
+        if not isinstance(v, Vector):
+            return NotImplemented
+        return self._coordinate_tuple() == v._coordinate_tuple()
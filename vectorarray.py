@@ -0,0 +1,184 @@
+from math import pi
+
+import numpy as np
+
+from vector import Vector, NUMPY
+
+
+class VectorArray(object):
+    """A batch of N vectors of dimension d stored as one N x d float64 array.
+
+    The operations mirror Vector but act row by row on the whole batch.
+    Wherever a VectorArray is expected a single Vector may be passed as
+    well; it is broadcast against every row.
+    """
+
+    CANNOT_NORMALIZE_ZERO_VECTOR_MSG = Vector.CANNOT_NORMALIZE_ZERO_VECTOR_MSG
+    NO_UNIQUE_PARALLEL_COMP_MSG = Vector.NO_UNIQUE_PARALLEL_COMP_MSG
+    ALL_VECTORS_MUST_BE_IN_SAME_DIM_MSG = 'All vectors should live in the same dimension'
+    ONLY_DEFINED_IN_THREE_DIMENSIONS_MSG = 'Cross products are only defined in two or three dimensions'
+
+    def __init__(self, coordinates):
+        try:
+            if isinstance(coordinates, VectorArray):
+                coordinates = coordinates.coordinates
+            elif len(coordinates) and isinstance(coordinates[0], Vector):
+                coordinates = [v.coordinates_for(NUMPY) for v in coordinates]
+            coordinates = np.array(coordinates, dtype=np.float64)
+            if coordinates.ndim != 2 or coordinates.shape[1] == 0:
+                raise ValueError
+
+            self.coordinates = coordinates
+            self.dimension = coordinates.shape[1]
+
+        except ValueError:
+            raise ValueError('The coordinates must be a nonempty N x d array')
+
+        except TypeError:
+            raise TypeError('The coordinates must be an iterable')
+
+    @staticmethod
+    def _operand(v):
+        if isinstance(v, VectorArray):
+            return v.coordinates
+        if isinstance(v, Vector):
+            return v.coordinates_for(NUMPY)
+        return np.asarray(v, dtype=np.float64)
+
+    def __add__(self, v):
+        return VectorArray(self.coordinates + self._operand(v))
+
+    def __sub__(self, v):
+        return VectorArray(self.coordinates - self._operand(v))
+
+    def __mul__(self, c):
+        """Row-wise dot products with vectors, or scaling by scalars.
+
+        A 1-D array of N scalars scales each row by its own factor.
+        """
+        if isinstance(c, (Vector, VectorArray)):
+            return np.einsum('ij,ij->i', *np.broadcast_arrays(
+                self.coordinates, self._operand(c)))
+        c = np.asarray(c, dtype=np.float64)
+        if c.ndim == 1:
+            c = c[:, np.newaxis]
+        return VectorArray(self.coordinates * c)
+
+    def magnitude(self):
+        return np.sqrt(np.einsum('ij,ij->i', self.coordinates, self.coordinates))
+
+    def is_zero(self, tolerance=1e-10):
+        return self.magnitude() < tolerance
+
+    def normalized(self):
+        """Every row as a unit vector; a single zero row makes the whole batch raise.
+
+        Use normalized_nonzero to normalize a batch that may hold zero rows.
+        """
+        magnitude = self.magnitude()
+        if np.any(magnitude == 0):
+            raise Exception(self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG)
+        return VectorArray(self.coordinates / magnitude[:, np.newaxis])
+
+    def normalized_nonzero(self):
+        """
+        The rows as unit vectors, and a boolean mask of the zero rows,
+        which cannot be normalized and are left as zero vectors.
+        """
+        magnitude = self.magnitude()
+        zero = magnitude == 0
+        return VectorArray(self.coordinates / np.where(zero, 1, magnitude)[:, np.newaxis]), zero
+
+    def angle(self, v, in_degrees=False):
+        try:
+            other = v if isinstance(v, VectorArray) else VectorArray([self._operand(v)])
+            ratio = np.round(self.normalized() * other.normalized(), 5)
+            angrad = np.arccos(np.clip(ratio, -1, 1))
+            if in_degrees:
+                return angrad * 180 / pi
+            else:
+                return angrad
+
+        except Exception as e:
+            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
+                raise Exception('Cannot compute an angle with the zero vector')
+            else:
+                raise e
+
+    def pairwiseAngles(self, w, in_degrees=False):
+        """N x M matrix of the angles between every row of self and of w."""
+        try:
+            ratio = np.round(self.normalized().coordinates.dot(
+                w.normalized().coordinates.T), 5)
+            angrad = np.arccos(np.clip(ratio, -1, 1))
+            if in_degrees:
+                return angrad * 180 / pi
+            else:
+                return angrad
+
+        except Exception as e:
+            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
+                raise Exception('Cannot compute an angle with the zero vector')
+            else:
+                raise e
+
+    def projectOn(self, b):
+        b = b if isinstance(b, VectorArray) else VectorArray([self._operand(b)])
+        try:
+            normalization = b.normalized()
+            return normalization * (self * normalization)
+
+        except Exception as e:
+            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
+                raise Exception(self.NO_UNIQUE_PARALLEL_COMP_MSG)
+            else:
+                raise e
+
+    def orthogonalTo(self, b):
+        return self - self.projectOn(b)
+
+    def crossProductOf(self, w):
+        a, b = np.broadcast_arrays(self.coordinates, self._operand(w))
+        if a.shape[1] == 2:
+            a = np.pad(a, ((0, 0), (0, 1)))
+            b = np.pad(b, ((0, 0), (0, 1)))
+        elif a.shape[1] != 3:
+            raise Exception(self.ONLY_DEFINED_IN_THREE_DIMENSIONS_MSG)
+        return VectorArray(np.cross(a, b))
+
+    def paraArea(self, w):
+        return self.crossProductOf(w).magnitude()
+
+    def triArea(self, w):
+        return 0.5 * self.paraArea(w)
+
+    def isParallel(self, v):
+        other = v if isinstance(v, VectorArray) else VectorArray([self._operand(v)])
+        zero = self.is_zero() | other.is_zero()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.round((self * other) /
+                             (self.magnitude() * other.magnitude()), 5)
+        return zero | (np.abs(ratio) == 1)
+
+    def isOrthogonal(self, v, tolerance=1e-10):
+        return np.abs(self * v) < tolerance
+
+    def __len__(self):
+        return self.coordinates.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Vector(self.coordinates[index], NUMPY)
+        return VectorArray(self.coordinates[index])
+
+    def __iter__(self):
+        for row in self.coordinates:
+            yield Vector(row, NUMPY)
+
+    def __str__(self):
+        return 'VectorArray: {} vectors of dimension {}'.format(
+            len(self), self.dimension)
+
+    def __eq__(self, v):
+        other = self._operand(v)
+        return self.coordinates.shape == other.shape and bool(np.all(self.coordinates == other))